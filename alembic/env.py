@@ -0,0 +1,71 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.core.search import FTS_TABLE
+from app.models import Base
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep the FTS5 index and its shadow tables (created by raw DDL) out of autogenerate"""
+    return not (type_ == "table" and name.startswith(FTS_TABLE))
+
+
+def database_url() -> str:
+    """sqlalchemy.url when set (alembic.ini, or the caller's Config), else the app's DATABASE_URL"""
+    url = config.get_main_option("sqlalchemy.url")
+    return url or settings.database_url or "sqlite:///./todos.db"
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without a database connection (alembic upgrade head --sql)"""
+    url = database_url()
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite cannot ALTER most things in place: recreate-and-copy instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Migrate on a connection passed in config.attributes["connection"] (tests), or a new one"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        run_migrations(connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,118 @@
+"""initial schema
+
+The tables as create_all made them before migrations were introduced, plus the
+SQLite FTS5 search index (see app.core.search). Databases created by create_all
+already have all of this: mark them with `alembic stamp 0001`, then upgrade.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 17:50:01.652447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# FTS5 index over todos(title, description) and its sync triggers, as of this revision
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def upgrade() -> None:
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=True)
+
+    op.create_table('users',
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_is_active', 'users', ['is_active'], unique=False)
+
+    op.create_table('todo_counters',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+
+    op.create_table('todos',
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_done', sa.Boolean(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_todos_due_date', 'todos', ['due_date'], unique=False)
+    op.create_index('ix_todos_id', 'todos', ['id'], unique=False)
+    op.create_index('ix_todos_is_done', 'todos', ['is_done'], unique=False)
+    op.create_index('ix_todos_owner_id', 'todos', ['owner_id'], unique=False)
+    op.create_index('ix_todos_title', 'todos', ['title'], unique=False)
+
+    op.create_table('todo_tag',
+    sa.Column('todo_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['todo_id'], ['todos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('todo_id', 'tag_id')
+    )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        try:
+            for statement in FTS_DDL:
+                op.execute(statement)
+        except sa.exc.OperationalError:
+            pass  # SQLite without FTS5: searches use LIKE
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('todos_fts_ai', 'todos_fts_ad', 'todos_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
+    op.drop_table('todo_tag')
+    op.drop_table('todos')
+    op.drop_table('todo_counters')
+    op.drop_table('users')
+    op.drop_table('tags')
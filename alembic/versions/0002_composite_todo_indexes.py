@@ -0,0 +1,54 @@
+"""composite todo indexes
+
+One index per TodoRepository query shape, each led by owner_id, so a user's rows
+are found, filtered and ordered from the index alone:
+
+    ix_todos_owner_created       lists and keyset pages by created_at; exports
+    ix_todos_owner_done_due      overdue, today, next due date of the data version
+    ix_todos_owner_done_created  lists filtered by is_done
+    ix_todo_tag_tag_todo         links by tag (the primary key serves links by todo)
+
+The single-column owner_id, is_done and due_date indexes are prefixes of these or
+unused on their own, and ix_*_id duplicate the primary keys: they are dropped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 18:05:12.301877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_owner_created', 'todos', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_todos_owner_done_due', 'todos', ['owner_id', 'is_done', 'due_date'], unique=False)
+    op.create_index('ix_todos_owner_done_created', 'todos', ['owner_id', 'is_done', 'created_at'], unique=False)
+    op.create_index('ix_todo_tag_tag_todo', 'todo_tag', ['tag_id', 'todo_id'], unique=False)
+
+    op.drop_index('ix_todos_owner_id', table_name='todos')
+    op.drop_index('ix_todos_is_done', table_name='todos')
+    op.drop_index('ix_todos_due_date', table_name='todos')
+    op.drop_index('ix_todos_id', table_name='todos')
+    op.drop_index('ix_users_id', table_name='users')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_todos_id', 'todos', ['id'], unique=False)
+    op.create_index('ix_todos_due_date', 'todos', ['due_date'], unique=False)
+    op.create_index('ix_todos_is_done', 'todos', ['is_done'], unique=False)
+    op.create_index('ix_todos_owner_id', 'todos', ['owner_id'], unique=False)
+
+    op.drop_index('ix_todo_tag_tag_todo', table_name='todo_tag')
+    op.drop_index('ix_todos_owner_done_created', table_name='todos')
+    op.drop_index('ix_todos_owner_done_due', table_name='todos')
+    op.drop_index('ix_todos_owner_created', table_name='todos')
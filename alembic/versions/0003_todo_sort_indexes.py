@@ -0,0 +1,51 @@
+"""todo sort indexes
+
+One owner-led index per list sort (TODO_SORTS) that the existing indexes do not
+already return in order, read forward or backward:
+
+    ix_todos_owner_title             sort=title, -title
+    ix_todos_owner_updated           sort=updated_at, -updated_at
+    ix_todos_owner_due               sort=due_date (undated todos last)
+    ix_todos_owner_done_due_created  sort=is_done,due_date,-created_at
+
+The last two index the expression due_date IS NULL, which autogenerate cannot
+compare on SQLite. ix_todos_title, over every owner's titles, is replaced by
+ix_todos_owner_title.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:20:47.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_owner_title', 'todos', ['owner_id', 'title', 'id'], unique=False)
+    op.create_index('ix_todos_owner_updated', 'todos', ['owner_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_todos_owner_due', 'todos',
+                    ['owner_id', sa.text('(due_date IS NULL)'), 'due_date', 'id'], unique=False)
+    op.create_index('ix_todos_owner_done_due_created', 'todos',
+                    ['owner_id', 'is_done', sa.text('(due_date IS NULL)'), 'due_date',
+                     sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+    op.drop_index('ix_todos_title', table_name='todos')
+
+
+def downgrade() -> None:
+    op.create_index('ix_todos_title', 'todos', ['title'], unique=False)
+
+    op.drop_index('ix_todos_owner_done_due_created', table_name='todos')
+    op.drop_index('ix_todos_owner_due', table_name='todos')
+    op.drop_index('ix_todos_owner_updated', table_name='todos')
+    op.drop_index('ix_todos_owner_title', table_name='todos')
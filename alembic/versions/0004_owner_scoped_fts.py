@@ -0,0 +1,91 @@
+"""owner-scoped full-text index
+
+todos_fts indexes owner_id alongside title and description, and searches match
+the owner's token together with the words: FTS5 then only visits and ranks the
+searching owner's rows, instead of every owner's matches before the owner filter.
+
+The index is rebuilt from the todos table (SQLite only; skipped when SQLite has
+no FTS5, as in 0001).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:41:09.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = ('todos_fts_ai', 'todos_fts_ad', 'todos_fts_au')
+
+# FTS5 index over todos(title, description, owner_id) and its sync triggers, as of this revision
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, owner_id,
+        content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+    """CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+    END""",
+    """CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description, owner_id ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+        INSERT INTO todos_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+]
+
+# The index as of 0001, for downgrade
+PREVIOUS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def replace_index(ddl) -> None:
+    """Drop todos_fts and its triggers, create them from ddl and index the existing todos"""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS todos_fts')
+    try:
+        for statement in ddl:
+            op.execute(statement)
+    except sa.exc.OperationalError:
+        return  # SQLite without FTS5: searches use LIKE
+    op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    replace_index(FTS_DDL)
+
+
+def downgrade() -> None:
+    replace_index(PREVIOUS_FTS_DDL)
@@ -0,0 +1,32 @@
+"""todo insert sentinel
+
+todos._sentinel numbers the rows of a multi-row INSERT ... RETURNING so that
+SQLAlchemy can hand the new ids back in parameter order
+(sort_by_parameter_order). SQLite returns RETURNING rows in no guaranteed
+order and has no other column to correlate them with. The column is only
+written by bulk inserts; existing rows keep NULL.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 22:05:31.640127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('todos', sa.Column('_sentinel', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('todos', '_sentinel')
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -14,14 +14,84 @@ class Settings(BaseSettings):
     # Environment
     environment: str = "development"
     
-    # Database (placeholder for Level 4)
+    # Database (defaults to sqlite:///./todos.db)
     database_url: Optional[str] = None
+    # Create missing tables and the search index at startup; turn off where migrations manage the schema
+    db_create_schema: bool = True
+    
+    # Read replicas for list/search/get reads (JSON list in env, e.g. DATABASE_REPLICA_URLS='["postgresql://..."]').
+    # Another engine on the same SQLite file works as a zero-lag stand-in for local testing.
+    database_replica_urls: List[str] = []
+    replica_selection: str = "round_robin"  # or "least_busy"
+    read_your_writes_window: float = 5  # seconds a user reads from the primary after writing; 0 disables
+    read_your_writes_size: int = 10000  # users tracked per process
+    
+    # Connection pool (QueuePool; for SQLite only when sqlite_pool is "queue")
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced; -1 never
+    db_pool_pre_ping: bool = True
+    
+    # SQLite: "queue" (pooled connections) or "static" (one connection shared by all threads)
+    sqlite_pool: str = "queue"
+    # SQLite PRAGMAs run on each new connection (None skips one)
+    sqlite_journal_mode: Optional[str] = "WAL"
+    sqlite_synchronous: Optional[str] = "NORMAL"
+    sqlite_mmap_size: Optional[int] = 268435456  # bytes
+    sqlite_cache_size: Optional[int] = -65536  # negative: KiB
+    sqlite_busy_timeout: Optional[int] = 5000  # ms
+    sqlite_temp_store: Optional[str] = "MEMORY"
+    # Serve requests through AsyncSession (False = sync Session in a threadpool)
+    async_database: bool = True
+    # Build todo responses without re-validation and return pre-serialized JSON bytes
+    fast_serialization: bool = False
+    # Use the SQLite FTS5 index for q searches when available (LIKE otherwise)
+    fts_search: bool = True
+    # Owners with fewer todos search them with LIKE through the owner index: below this, scanning
+    # their rows costs less than FTS5's prefix matching (see benchmarks/search_fts.py)
+    fts_min_todos: int = 2000
+    # Collect Prometheus metrics and serve them on /metrics
+    metrics_enabled: bool = True
+    # Share of requests whose SQL is traced (0 disables the tracer, 1 traces every request)
+    sql_trace_sample_rate: float = 0.0
+    # A traced request is logged when it runs more statements or takes longer than this
+    sql_trace_max_statements: int = 20
+    sql_trace_max_duration_ms: float = 500
+    # Statement shapes repeated this often in one request are logged as possible N+1 queries
+    sql_trace_repeat_threshold: int = 5
     
     # JWT Configuration
     secret_key: str = "your-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Authenticated-principal cache (skips the user lookup on repeat tokens)
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 60  # seconds; entries never outlive the token exp
+    
+    # Rows fetched per round trip (and held in memory) by GET /todos/export
+    export_chunk_size: int = 1000
+    
+    # POST /todos/import: records validated and committed per transaction, and errors reported
+    import_chunk_size: int = 1000
+    import_max_errors: int = 100
+    import_max_record_size: int = 64 * 1024  # characters per line, and per CSV record; longer ones fail
+    
+    # Per-owner data version cache behind ETags on todo reads
+    data_version_cache_size: int = 10000
+    data_version_ttl: int = 5  # seconds; bounds staleness after writes made by other processes
+    
+    # Tag name -> id cache (shared by every request in the process)
+    tag_cache_size: int = 10000
+    
+    # Password hashing (bcrypt runs off the event loop in a worker pool)
+    password_hash_rounds: int = 12
+    hash_executor: str = "process"  # "process" or "thread"
+    hash_workers: Optional[int] = None  # defaults to the CPU count
+    hash_queue_depth: int = 64  # waiting jobs allowed before answering 503
+    hash_retry_after: int = 1  # seconds, sent in Retry-After on 503
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
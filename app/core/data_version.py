@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+from app.core.config import settings
+from app.utils.cache import LRUCache
+
+
+class DataVersion(NamedTuple):
+    """What a user's todo reads depend on, short of the rows themselves"""
+    version: int  # bumped by every write of the owner's todos
+    modified_at: Optional[datetime]  # time of the last write (UTC)
+    next_due: Optional[datetime]  # earliest future due_date of an open todo: /overdue changes when it passes
+
+
+class DataVersionCache:
+    """Per-process cache of owner_id -> DataVersion, so conditional reads skip the database.
+
+    Writes made through TodoRepository drop the owner's entry on commit. The TTL
+    bounds how long a write made by another process can go unnoticed, and an
+    entry is never used once its next_due has passed.
+
+    A version read from the database is stored through reading(): a write that
+    commits while the read is in flight may not be visible to it, so the result
+    is only cached when no invalidation of the owner happened since the read began.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._invalidations = 0  # every invalidate() takes the next number
+        self._readers: Dict[int, int] = {}  # owner_id -> reads in flight
+        self._last_invalidated: Dict[int, int] = {}  # owner_id -> its last invalidation, while it has reads in flight
+
+    def get(self, owner_id: int) -> Optional[DataVersion]:
+        entry = self._cache.get(owner_id)
+        if entry is not None and entry.next_due is not None and entry.next_due <= datetime.now():
+            return None
+        return entry
+
+    def put(self, owner_id: int, data_version: DataVersion):
+        self._cache.set(owner_id, data_version)
+
+    @contextmanager
+    def reading(self, owner_id: int) -> Iterator[Callable[[DataVersion], None]]:
+        """Wrap a database read of the owner's data version; yields a store(data_version)
+        that caches it unless the owner was invalidated after the read began"""
+        with self._lock:
+            started = self._invalidations
+            self._readers[owner_id] = self._readers.get(owner_id, 0) + 1
+
+        def store(data_version: DataVersion):
+            with self._lock:
+                if self._last_invalidated.get(owner_id, 0) <= started:
+                    self._cache.set(owner_id, data_version)
+
+        try:
+            yield store
+        finally:
+            with self._lock:
+                self._readers[owner_id] -= 1
+                if not self._readers[owner_id]:
+                    del self._readers[owner_id]
+                    self._last_invalidated.pop(owner_id, None)
+
+    def invalidate(self, owner_id: int):
+        with self._lock:
+            self._invalidations += 1
+            if owner_id in self._readers:
+                self._last_invalidated[owner_id] = self._invalidations
+            self._cache.delete(owner_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def make_etag(owner_id: int, data_version: DataVersion, path: str, query: str) -> str:
+    """Weak ETag over everything a todo read depends on: data version, day, overdue boundary and URL"""
+    key = f"{owner_id}|{data_version.version}|{date.today()}|{data_version.next_due}|{path}|{query}"
+    return f'W/"{data_version.version}-{hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime for Last-Modified"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+# Global data version cache
+data_versions = DataVersionCache(
+    maxsize=settings.data_version_cache_size,
+    ttl=settings.data_version_ttl,
+)
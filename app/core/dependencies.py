@@ -1,46 +1,50 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_token
-from app.services.todo_service import TodoService
-from app.services.user_service import UserService
-from app.models.user import User as UserModel
+from app.core.data_version import etag_matches, http_date, make_etag
+from app.core.database import get_session
+from app.core.principal_cache import Principal, principal_cache
+from app.core.replicas import replica_router
+from app.core.security import decode_token
+from app.schemas.todo import TODO_FIELDS, TODO_SORTS
+from app.services.todo_service import AsyncTodoService
+from app.services.user_service import AsyncUserService
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 
-def get_todo_service(db: Session = Depends(get_db)) -> TodoService:
-    """Dependency to get TodoService with database session"""
-    return TodoService(db)
-
-
-def get_user_service(db: Session = Depends(get_db)) -> UserService:
-    """Dependency to get UserService with database session"""
-    return UserService(db)
+def get_user_service(db=Depends(get_session)) -> AsyncUserService:
+    """Dependency to get AsyncUserService with database session"""
+    return AsyncUserService(db)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> UserModel:
+    user_service: AsyncUserService = Depends(get_user_service)
+) -> Principal:
     """Dependency to get current authenticated user from JWT token"""
-    email = verify_token(token)
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = db.query(UserModel).filter(UserModel.email == email).first()
+    user = principal_cache.get(token)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        payload = decode_token(token)
+        email = payload.get("sub") if payload else None
+        if email is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        db_user = await user_service.get_user_by_email(email)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user = Principal.from_user(db_user)
+        principal_cache.put(token, user, expires_at=payload.get("exp"))
     
     if not user.is_active:
         raise HTTPException(
@@ -48,4 +52,89 @@ async def get_current_user(
             detail="User is not active"
         )
     
-    return user
\ No newline at end of file
+    return user
+
+
+# Session for writes and for anything that must see the latest data: always the primary
+get_write_db = get_session
+
+
+async def get_read_db(
+    db=Depends(get_write_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Dependency to get a read-only session: a replica, or the primary's session when no
+    replica is configured or the user wrote within the read-your-writes window"""
+    replica = replica_router.choose(current_user.id)
+    if replica is None:
+        yield db
+        return
+    async with replica.open_session() as read_db:
+        yield read_db
+
+
+def get_todo_service(db=Depends(get_write_db), read_db=Depends(get_read_db)) -> AsyncTodoService:
+    """Dependency to get AsyncTodoService for read routes, with write and read database sessions"""
+    return AsyncTodoService(db, read_db=read_db)
+
+
+def get_todo_write_service(db=Depends(get_write_db)) -> AsyncTodoService:
+    """Dependency to get AsyncTodoService on the primary only, for write routes (and exports,
+    which open their own read session): no replica session is opened for them"""
+    return AsyncTodoService(db)
+
+
+def todo_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,is_done,due_date "
+                                                    "(default: all; id is always included)")
+) -> Optional[Tuple[str, ...]]:
+    """Dependency parsing a sparse fieldset: the requested todo fields in response order, or None for all"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(TODO_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))} (available: {', '.join(TODO_FIELDS)})"
+        )
+    return tuple(name for name in TODO_FIELDS if name in requested or name == "id")
+
+
+def todo_sort(
+    sort: Optional[str] = Query(None, description="Comma-separated keys, - for descending: " + "; ".join(TODO_SORTS) +
+                                                  "; or relevance (with q). Default: -created_at")
+) -> Optional[str]:
+    """Dependency validating a list sort: one of TODO_SORTS or relevance, or None for the default"""
+    if sort is None:
+        return None
+    sort = ",".join(key.strip() for key in sort.split(","))
+    if sort != "relevance" and sort not in TODO_SORTS:
+        # Only orders an index returns rows in are offered: anything else would sort the owner's whole list
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort: {sort} (available: {', '.join(TODO_SORTS)}, relevance)"
+        )
+    return sort
+
+
+async def conditional_todo_read(
+    request: Request,
+    response: Response,
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Dependency for todo list reads: ETag, Last-Modified and Cache-Control headers.
+
+    Answers 304 when If-None-Match matches, before any todo is queried.
+    """
+    data_version = await todo_service.get_data_version(current_user.id)
+    headers = {
+        "ETag": make_etag(current_user.id, data_version, request.url.path, str(request.query_params)),
+        "Cache-Control": "private, no-cache",
+    }
+    if data_version.modified_at is not None:
+        headers["Last-Modified"] = http_date(data_version.modified_at)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,70 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+from app.core.config import settings
+
+
+class HashingQueueFull(Exception):
+    """Raised when the hashing pool already has queue_depth jobs waiting"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class HashingExecutor:
+    """Bounded worker pool for CPU-heavy password hashing.
+
+    Jobs beyond workers + queue_depth are rejected with HashingQueueFull
+    instead of piling up, so a burst of logins cannot grow the backlog
+    without limit. The pending count is only touched from the event loop.
+    """
+
+    def __init__(self, kind: str = "process", workers: Optional[int] = None, queue_depth: int = 64):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown hash executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_depth
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Imported here: loading multiprocessing is only worth it once a hash is needed
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool, or raise HashingQueueFull when saturated"""
+        if self.pending >= self.capacity:
+            raise HashingQueueFull(settings.hash_retry_after)
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        """Stop the worker pool (it is recreated lazily on next use)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global hashing pool
+hashing_executor = HashingExecutor(
+    kind=settings.hash_executor,
+    workers=settings.hash_workers,
+    queue_depth=settings.hash_queue_depth,
+)
@@ -0,0 +1,351 @@
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from app.core.config import settings
+
+# Default latency buckets (seconds), as in the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Buckets for per-request statement counts
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# SQL operations tracked separately; anything else is "other"
+SQL_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE"))
+
+# HTTP methods labelled as sent; anything else is "other" (the method is client-controlled)
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"))
+
+# Route label of requests that matched no route (keeps scanners from adding series)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _ShardOwner:
+    """Referenced only from its thread's threading.local, so it is collected when the thread exits"""
+
+    __slots__ = ("__weakref__",)
+
+
+class Metric:
+    """A named metric whose values are kept in one shard per thread.
+
+    Each thread only ever writes its own dict, so the hot path takes no lock;
+    a scrape sums the shards. When a thread exits, its shard is folded into a
+    shared base total, so short-lived threads do not pile up shards. Label
+    values are passed positionally, in the order of labelnames, and must come
+    from a bounded set.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._base: dict = {}  # totals of the threads that have exited
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            with self._shards_lock:
+                self._shards.append(values)
+            self._local.owner = owner = _ShardOwner()
+            weakref.finalize(owner, self._retire, values).atexit = False
+            self._local.values = values
+            return values
+
+    def _retire(self, values: dict):
+        """Fold an exited thread's shard into the base total"""
+        with self._shards_lock:
+            self._shards.remove(values)
+            self._add(self._base, values)
+
+    def _snapshot(self) -> List[dict]:
+        with self._shards_lock:
+            shards = [self._base] + self._shards
+            return [dict(shard) for shard in shards]
+
+    def _add(self, totals: dict, shard: dict):
+        """Add shard's values into totals"""
+        raise NotImplementedError
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic total"""
+
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _add(self, totals: dict, shard: dict):
+        for key, value in shard.items():
+            totals[key] = totals.get(key, 0) + value
+
+    def samples(self) -> Iterable[Sample]:
+        totals = {}
+        for shard in self._snapshot():
+            self._add(totals, shard)
+        for key, value in totals.items():
+            yield self.name, self._labels(key), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down (shards hold deltas, so inc and dec may run on different threads)"""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # Per-bucket counts (last one is +Inf), then the sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the block's duration"""
+        return _Timer(self, labels)
+
+    def _add(self, totals: dict, shard: dict):
+        for key, entry in shard.items():
+            total = totals.get(key)
+            totals[key] = list(entry) if total is None else [a + b for a, b in zip(total, entry)]
+
+    def samples(self) -> Iterable[Sample]:
+        totals = {}
+        for shard in self._snapshot():
+            self._add(totals, shard)
+        for key, entry in totals.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, entry[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    """Metrics plus scrape-time collectors, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register fn() -> [(name, type, help, [(labels, value), ...]), ...], called on every scrape"""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collect in self.collectors:
+            for name, metric_type, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the API's metrics
+registry = Registry()
+
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being served", ["method"],
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency, until the last body byte is sent", ["method", "route", "status"],
+))
+http_request_db_statements = registry.register(Histogram(
+    "http_request_db_statements", "SQL statements executed per request", ["route"], buckets=COUNT_BUCKETS,
+))
+http_request_db_duration = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request", ["route"],
+))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ["operation"],
+))
+db_pool_checkout_duration = registry.register(Histogram(
+    "db_pool_checkout_duration_seconds", "Time waited for a pooled connection",
+))
+password_hash_duration = registry.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt time per password hash or verification", ["operation"],
+))
+
+
+class RequestStats:
+    """SQL work done on behalf of the current request"""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Stats of the request being served; copied into threadpool calls and run_sync greenlets
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+    operation = statement.lstrip()[:6].upper()
+    db_statement_duration.observe(elapsed, operation if operation in SQL_OPERATIONS else "other")
+    stats = request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("metrics_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(sync_engine):
+    """Time every statement the engine executes and count it against the current request"""
+    if not settings.metrics_enabled:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+_timed_pools: Dict[type, type] = {}
+
+
+def timed_pool(poolclass: type) -> type:
+    """Subclass of poolclass recording how long each checkout waits for a connection"""
+    if not settings.metrics_enabled:
+        return poolclass
+    timed = _timed_pools.get(poolclass)
+    if timed is None:
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return poolclass._do_get(self)
+            finally:
+                db_pool_checkout_duration.observe(time.perf_counter() - start)
+
+        timed = _timed_pools[poolclass] = type(poolclass.__name__, (poolclass,), {"_do_get": _do_get})
+    return timed
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and SQL work per route.
+
+    Routes are labelled by their path template (/todos/{todo_id}), never the
+    raw path, and methods outside HTTP_METHODS as "other", so the number of
+    series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        status = "500"
+        stats = RequestStats()
+        token = request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec(method)
+            request_stats.reset(token)
+            route = scope.get("route")
+            route = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+            http_request_duration.observe(elapsed, method, route, status)
+            http_request_db_statements.observe(stats.statements, route)
+            http_request_db_duration.observe(stats.db_seconds, route)
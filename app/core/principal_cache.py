@@ -0,0 +1,66 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+from app.utils.cache import LRUCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight snapshot of an authenticated user"""
+    id: int
+    email: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class PrincipalCache:
+    """Per-process cache of token -> Principal, so authenticated requests skip
+    the JWT decode and the user lookup.
+
+    Keys are SHA-256 digests of the raw token: a token that was decoded and
+    verified once maps to its user until the token's exp or the configured
+    TTL, whichever comes first.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def get(self, token: str) -> Optional[Principal]:
+        return self._cache.get(self._key(token))
+    
+    def put(self, token: str, principal: Principal, expires_at: Optional[float] = None):
+        self._cache.set(self._key(token), principal, expires_at=expires_at)
+    
+    def invalidate_user(self, user_id: int) -> int:
+        """Forget every cached token of a user (e.g. after deactivation)"""
+        return self._cache.delete_where(lambda principal: principal.id == user_id)
+    
+    def clear(self):
+        self._cache.clear()
+    
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+# Global principal cache
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl,
+)
@@ -0,0 +1,94 @@
+import itertools
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import create_db_engine, open_session
+from app.utils.cache import LRUCache
+
+
+class Replica:
+    """A read replica: its engines and session factories, each created on first use
+    (so only the engine the database mode uses gets a pool)"""
+    
+    def __init__(self, url: str):
+        self.url = url
+    
+    @cached_property
+    def engine(self):
+        return create_db_engine(self.url)
+    
+    @cached_property
+    def async_engine(self):
+        return create_db_engine(self.url, is_async=True)
+    
+    @cached_property
+    def session_factory(self):
+        return sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+    
+    @cached_property
+    def async_session_factory(self):
+        return async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+    
+    def busy(self) -> int:
+        """Connections checked out of the pool requests use (0 for pools that do not count)"""
+        engine = self.async_engine.sync_engine if settings.async_database else self.engine
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+    
+    def open_session(self):
+        if settings.async_database:
+            return open_session(async_session_factory=self.async_session_factory)
+        return open_session(self.session_factory)
+
+
+class ReplicaRouter:
+    """Chooses where read-only work runs: a replica, or the primary.
+
+    Replicas are picked round-robin or by fewest checked-out connections
+    ("least_busy"). A user whose write this process committed within the last
+    read_your_writes_window seconds reads from the primary, so replication lag
+    never hides their own changes.
+    """
+    
+    def __init__(self, urls: List[str], selection: str, sticky_window: float, sticky_size: int):
+        self.replicas = [Replica(url) for url in urls]
+        self.selection = selection
+        self._turn = itertools.count()
+        self._recent_writers = LRUCache(maxsize=sticky_size, ttl=sticky_window) if sticky_window > 0 else None
+    
+    def note_write(self, user_id: int):
+        """Pin the user's reads to the primary for the read-your-writes window"""
+        if self.replicas and self._recent_writers is not None:
+            self._recent_writers.set(user_id, True)
+    
+    def choose(self, user_id: Optional[int] = None) -> Optional[Replica]:
+        """The replica for a read, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        if user_id is not None and self._recent_writers is not None and self._recent_writers.get(user_id):
+            return None
+        start = next(self._turn) % len(self.replicas)
+        rotation = self.replicas[start:] + self.replicas[:start]
+        if self.selection == "least_busy":
+            # Ties go round-robin
+            return min(rotation, key=Replica.busy)
+        return rotation[0]
+    
+    @asynccontextmanager
+    async def open_session(self, user_id: Optional[int] = None):
+        """Open a read session on the chosen replica, or on the primary"""
+        replica = self.choose(user_id)
+        async with (replica.open_session() if replica else open_session()) as db:
+            yield db
+
+
+# Global replica router (no replicas configured: every read uses the primary)
+replica_router = ReplicaRouter(
+    urls=settings.database_replica_urls,
+    selection=settings.replica_selection,
+    sticky_window=settings.read_your_writes_window,
+    sticky_size=settings.read_your_writes_size,
+)
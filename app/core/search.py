@@ -0,0 +1,138 @@
+import re
+from typing import Optional
+from sqlalchemy import column, func, inspect, literal_column, select, table, text
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+
+# External-content FTS5 index over todos(title, description, owner_id); rowid is todos.id.
+# owner_id is indexed as a token so a search matches one owner's rows, not the whole table's
+FTS_TABLE = "todos_fts"
+fts_table = table(FTS_TABLE, column("rowid"))
+FTS_TRIGGERS = [f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au"]
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, owner_id,
+        content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, owner_id ON todos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+]
+
+# Set once install_fts has created the index; search falls back to LIKE otherwise
+_fts_installed = False
+
+
+def _owner_scoped(conn) -> bool:
+    """Whether the FTS table exists and indexes owner_id (indexes made before it did cannot be scoped)"""
+    if not inspect(conn).has_table(FTS_TABLE):
+        return False
+    return "owner_id" in {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({FTS_TABLE})")}
+
+
+def install_fts(engine) -> bool:
+    """Create the FTS5 index and its sync triggers (SQLite only).
+
+    An index without the owner_id column is dropped and rebuilt. Returns False
+    when the database is not SQLite or SQLite was built without FTS5; search
+    then keeps using LIKE.
+    """
+    global _fts_installed
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        is_new = not _owner_scoped(conn)
+        if is_new:
+            for trigger in FTS_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        try:
+            for statement in FTS_DDL:
+                conn.execute(text(statement))
+        except OperationalError:
+            # no such module: fts5
+            return False
+        if is_new:
+            # Index rows that existed before the FTS table
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    _fts_installed = True
+    return True
+
+
+def detect_fts(engine) -> bool:
+    """Use an FTS index created earlier (by install_fts or a migration), without running DDL.
+
+    An index without owner_id (before migration 0004) is not used: search keeps using LIKE.
+    """
+    global _fts_installed
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        _fts_installed = _owner_scoped(conn)
+    return _fts_installed
+
+
+def fts_enabled() -> bool:
+    """Whether q searches should use the FTS5 index"""
+    return _fts_installed and settings.fts_search
+
+
+def fts_worthwhile(owner_todos: int) -> bool:
+    """Whether a search over an owner's owner_todos todos should use the FTS5 index rather than LIKE"""
+    return fts_enabled() and owner_todos >= settings.fts_min_todos
+
+
+def match_expression(q: str) -> Optional[str]:
+    """Turn user input into an FTS5 query: every word must match, as a prefix.
+
+    Words are quoted, so FTS5 operators in the input are treated as text.
+    Returns None when q has no searchable words.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def owner_match(expression: str, owner_id: int) -> str:
+    """The FTS5 query for expression's words in one owner's titles and descriptions.
+
+    The owner token is matched with the words, so FTS5 only visits (and ranks) rows
+    of that owner instead of every owner's matches before the owner filter.
+    """
+    return f'owner_id:"{int(owner_id)}" AND {{title description}}:({expression})'
+
+
+def match_ids(expression: str, owner_id: int):
+    """SELECT rowid FROM todos_fts WHERE todos_fts MATCH <owner's expression> (for todos.id IN (...))"""
+    fts = literal_column(FTS_TABLE)
+    return select(fts_table.c.rowid).where(fts.op("MATCH")(owner_match(expression, owner_id)))
+
+
+def match_ranked(expression: str, owner_id: int):
+    """Materialized CTE of (rowid, score) for the owner's matches, for ordering by relevance.
+
+    bm25 is weighted so title hits outrank description hits (owner_id, in every
+    match, does not count); lower is better. MATERIALIZED stops SQLite from
+    flattening the CTE into the join, which would re-run the full-text query
+    once per candidate todo.
+    """
+    fts = literal_column(FTS_TABLE)
+    return (
+        select(fts_table.c.rowid, func.bm25(fts, 10.0, 1.0, 0.0).label("score"))
+        .where(fts.op("MATCH")(owner_match(expression, owner_id)))
+        .cte("fts_match")
+        .prefix_with("MATERIALIZED")
+    )
@@ -1,29 +1,67 @@
-import bcrypt
-from jose import JWTError, jwt
+# bcrypt and jose (which loads cryptography) are imported on first use, to keep startup fast
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.metrics import password_hash_duration
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against hash using bcrypt"""
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    import bcrypt
     try:
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception:
         return False
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
+def _hashpw(password: str) -> str:
+    import bcrypt
     # Limit password to 72 bytes as per bcrypt spec
     password_bytes = password[:72].encode('utf-8')
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.password_hash_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
+def timed_call(fn, *args):
+    """Run fn(*args) and return (result, seconds); runs in the hashing worker, so queueing is not counted"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against hash using bcrypt"""
+    result, elapsed = timed_call(_checkpw, plain_password, hashed_password)
+    password_hash_duration.observe(elapsed, "verify")
+    return result
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password using bcrypt"""
+    result, elapsed = timed_call(_hashpw, password)
+    password_hash_duration.observe(elapsed, "hash")
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool (keeps bcrypt off the event loop)"""
+    result, elapsed = await hashing_executor.run(timed_call, _checkpw, plain_password, hashed_password)
+    password_hash_duration.observe(elapsed, "verify")
+    return result
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool (keeps bcrypt off the event loop)"""
+    result, elapsed = await hashing_executor.run(timed_call, _hashpw, password)
+    password_hash_duration.observe(elapsed, "hash")
+    return result
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -35,13 +73,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return email"""
+def decode_token(token: str) -> Optional[dict]:
+    """Verify JWT token and return its claims"""
+    from jose import JWTError, jwt
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return email
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return email"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    return email
\ No newline at end of file
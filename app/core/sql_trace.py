@@ -0,0 +1,194 @@
+import logging
+import random
+import re
+import time
+import traceback
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine.cursor import CursorFetchStrategy
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Literals and expanded parameter lists, replaced so statements of one shape compare equal
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_ROW_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """Statement shape: literals become ?, parameter and VALUES lists become (...), whitespace collapses"""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAM_LIST.sub("(...)", shape)
+    shape = _ROW_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def stack_summary(limit: int = 6) -> str:
+    """The innermost application frames of the current stack, one per line"""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if "/app/" in frame.filename and not frame.filename.endswith("sql_trace.py")
+    ]
+    return "\n".join(f"  {frame.filename}:{frame.lineno} in {frame.name}" for frame in frames[-limit:])
+
+
+class StatementStats:
+    """Executions of one statement shape within a request"""
+
+    __slots__ = ("count", "seconds", "rows", "stack")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.stack: Optional[str] = None
+
+
+class RequestTrace:
+    """Statements a sampled request ran, grouped by shape (so memory is bounded by distinct shapes)"""
+
+    def __init__(self):
+        self.shapes: Dict[str, StatementStats] = {}
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    def record(self, statement: str, seconds: float, rows: Optional[int]) -> StatementStats:
+        shape = normalize_sql(statement)
+        stats = self.shapes.get(shape)
+        if stats is None:
+            stats = self.shapes[shape] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        if rows is not None:
+            stats.rows += rows
+        if stats.count == settings.sql_trace_repeat_threshold:
+            # Captured once, where the repetition becomes suspicious
+            stats.stack = stack_summary()
+        self.statements += 1
+        self.db_seconds += seconds
+        return stats
+
+    def repeated(self):
+        """(shape, stats) of shapes run at least sql_trace_repeat_threshold times"""
+        return [(shape, stats) for shape, stats in self.shapes.items() if stats.stack is not None]
+
+    def slowest(self, limit: int = 5):
+        return sorted(self.shapes.items(), key=lambda item: item[1].seconds, reverse=True)[:limit]
+
+
+class _CountingFetchStrategy(CursorFetchStrategy):
+    """The default cursor fetch strategy, adding the rows it hands out to a statement shape's stats"""
+
+    __slots__ = ("stats",)
+
+    def __init__(self, stats: StatementStats):
+        self.stats = stats
+
+    def fetchone(self, result, dbapi_cursor, hard_close=False):
+        row = super().fetchone(result, dbapi_cursor, hard_close)
+        if row is not None:
+            self.stats.rows += 1
+        return row
+
+    def fetchmany(self, result, dbapi_cursor, size=None):
+        rows = super().fetchmany(result, dbapi_cursor, size)
+        self.stats.rows += len(rows)
+        return rows
+
+    def fetchall(self, result, dbapi_cursor):
+        rows = super().fetchall(result, dbapi_cursor)
+        self.stats.rows += len(rows)
+        return rows
+
+
+# Trace of the request being served, None when the request was not sampled
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_trace.get() is not None:
+        conn.info.setdefault("trace_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = current_trace.get()
+    if trace is None:
+        return
+    elapsed = time.perf_counter() - conn.info["trace_start"].pop()
+    if cursor.description is None:
+        # No result rows: the DB-API rowcount is the rows written
+        rowcount = getattr(cursor, "rowcount", -1)
+        trace.record(statement, elapsed, rowcount if rowcount is not None and rowcount >= 0 else None)
+        return
+    # Result rows (SELECT, RETURNING): drivers such as sqlite3 report rowcount -1 for them, so count
+    # the rows as the result fetches them. Streamed results keep their own buffered strategy.
+    stats = trace.record(statement, elapsed, None)
+    if context is not None and type(context.cursor_fetch_strategy) is CursorFetchStrategy \
+            and not context.execution_options.get("stream_results"):
+        context.cursor_fetch_strategy = _CountingFetchStrategy(stats)
+
+
+def _handle_error(exception_context):
+    if current_trace.get() is None or exception_context.connection is None:
+        return
+    starts = exception_context.connection.info.get("trace_start")
+    if starts:
+        starts.pop()
+
+
+def install_tracer(sync_engine):
+    """Record the statements of sampled requests run on the engine"""
+    if settings.sql_trace_sample_rate <= 0:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def report(method: str, route: str, elapsed: float, trace: RequestTrace):
+    """Log a traced request that crossed a threshold, and any repeated statement shapes"""
+    if trace.statements > settings.sql_trace_max_statements or elapsed * 1000 > settings.sql_trace_max_duration_ms:
+        lines = [
+            f"  {stats.count}x {stats.seconds * 1000:.1f} ms {stats.rows} rows: {shape}"
+            for shape, stats in trace.slowest()
+        ]
+        logger.warning(
+            "Slow request %s %s: %.1f ms, %d statements, %.1f ms in SQL\n%s",
+            method, route, elapsed * 1000, trace.statements, trace.db_seconds * 1000, "\n".join(lines),
+        )
+    for shape, stats in trace.repeated():
+        logger.warning(
+            "Possible N+1 in %s %s: %d x %s\n%s",
+            method, route, stats.count, shape, stats.stack,
+        )
+
+
+class SQLTraceMiddleware:
+    """ASGI middleware tracing the SQL of a sample of requests (sql_trace_sample_rate)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= settings.sql_trace_sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_trace.reset(token)
+            route = scope.get("route")
+            route = getattr(route, "path_format", None) or scope["path"]
+            report(scope["method"], route, elapsed, trace)
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process was spawned (Linux /proc, 10 ms resolution); None elsewhere"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the parenthesized command name start at field 3; starttime is field 22
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+        return round(uptime_seconds - start_ticks / os.sysconf("SC_CLK_TCK"), 3)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """Seconds from process spawn to each startup phase (imported, ready, ...)"""
+
+    def __init__(self):
+        self.phases: Dict[str, Optional[float]] = {}
+
+    def mark(self, phase: str):
+        self.phases[phase] = process_age()
+
+    def report(self) -> dict:
+        return {"seconds_since_spawn": dict(self.phases)}
+
+
+@lru_cache(maxsize=1)
+def import_breakdown(module: str = "app.main", top: int = 25) -> dict:
+    """Import cost of module in a fresh interpreter, from python -X importtime.
+
+    Self time is summed per top-level package and the most expensive are
+    returned (milliseconds). Runs once per process; meant for debug mode only.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, timeout=60,
+    )
+    packages: Dict[str, float] = {}
+    modules: List[tuple] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # the header row
+        name = name.strip()
+        packages[name.split(".")[0]] = packages.get(name.split(".")[0], 0) + self_us / 1000
+        modules.append((name, self_us / 1000, cumulative_us / 1000))
+    return {
+        "module": module,
+        "total_ms": round(sum(packages.values()), 1),
+        "packages_ms": {
+            name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_ms": [
+            {"module": name, "self": round(self_ms, 1), "cumulative": round(cumulative_ms, 1)}
+            for name, self_ms, cumulative_ms in sorted(modules, key=lambda item: -item[1])[:top]
+        ],
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode else None,
+    }
+
+
+# Global startup timer (app.main marks its phases)
+startup_timer = StartupTimer()
@@ -1,22 +1,63 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import make_url
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.hashing import HashingQueueFull, hashing_executor
+from app.core.metrics import MetricsMiddleware
+from app.core.replicas import replica_router
+from app.core.search import detect_fts, install_fts
+from app.core.sql_trace import SQLTraceMiddleware
+from app.core.startup import startup_timer
+from app.utils.pagination import InvalidCursor
 from app.models.todo import Todo  # Import models to register them
 from app.models.user import User  # Import User model to register it
 from app.models.tag import Tag  # Import Tag model to register it
-from app.routers import health, todos, auth
+from app.models.todo_counter import TodoCounter  # Import TodoCounter model to register it
+from app.routers import health, todos, auth, metrics
+
+
+def prepare_database():
+    """Create missing tables and the FTS index (db_create_schema), or just detect the index"""
+    setup_engines = [engine]
+    if not settings.db_create_schema:
+        detect_fts(engine)
+    else:
+        Base.metadata.create_all(bind=engine)
+        install_fts(engine)
+        # Local SQLite replica stand-ins need the schema too (real replicas get it from the primary)
+        for replica in replica_router.replicas:
+            if make_url(replica.url).get_backend_name() == "sqlite":
+                Base.metadata.create_all(bind=replica.engine)
+                install_fts(replica.engine)
+                setup_engines.append(replica.engine)
+    if settings.async_database:
+        # Requests use the async engines: the sync ones were only needed for the setup above
+        for setup_engine in setup_engines:
+            setup_engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the database once the worker starts, not at import; stop the hashing pool on shutdown"""
+    await run_in_threadpool(prepare_database)
+    startup_timer.mark("ready")
+    yield
+    hashing_executor.shutdown()
 
-# Create all tables on startup
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     description="A professional ToDo API built with FastAPI",
     version=settings.version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -28,12 +69,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Slow-query and N+1 logging for a sample of requests
+if settings.sql_trace_sample_rate > 0:
+    app.add_middleware(SQLTraceMiddleware)
+
+# Request metrics (outermost, so CORS preflights are counted too)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    """Shed login/register load when the hashing pool is saturated"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    """Reject malformed or mismatched pagination cursors"""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
 # API v1 Routes
 api_v1_prefix = settings.api_v1_prefix
 app.include_router(health.router, prefix=api_v1_prefix)
 app.include_router(auth.router, prefix=api_v1_prefix)
 app.include_router(todos.router, prefix=api_v1_prefix)
 
+# Prometheus scrape endpoint, outside the versioned API
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
+
 
 @app.get("/")
 async def root():
@@ -44,4 +117,7 @@ async def root():
         "environment": settings.environment,
         "docs": f"{settings.api_v1_prefix}/docs",
         "redoc": f"{settings.api_v1_prefix}/redoc"
-    }
\ No newline at end of file
+    }
+
+
+startup_timer.mark("imported")
@@ -2,5 +2,6 @@ from app.models.base import Base, BaseModel
 from app.models.user import User
 from app.models.todo import Todo
 from app.models.tag import Tag
+from app.models.todo_counter import TodoCounter
 
-__all__ = ["Base", "BaseModel", "User", "Todo", "Tag"]
\ No newline at end of file
+__all__ = ["Base", "BaseModel", "User", "Todo", "Tag", "TodoCounter"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Table, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -8,7 +8,9 @@ todo_tag_association = Table(
     'todo_tag',
     Base.metadata,
     Column('todo_id', Integer, ForeignKey('todos.id', ondelete='CASCADE'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves lookups by todo; this one serves lookups by tag
+    Index('ix_todo_tag_tag_todo', 'tag_id', 'todo_id'),
 )
 
 
@@ -20,7 +22,7 @@ class Tag(Base):
     name = Column(String(50), unique=True, nullable=False, index=True)
     
     # Relationship
-    todos = relationship("Todo", secondary=todo_tag_association, back_populates="tags")
+    todos = relationship("Todo", secondary=todo_tag_association, back_populates="tags", lazy="raise")
     
     def __repr__(self):
         return f"<Tag(id={self.id}, name={self.name})>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Text, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Boolean, Text, Integer, ForeignKey, DateTime, Index, insert_sentinel
 from sqlalchemy.orm import relationship
 from app.models.base import Base, BaseModel
 from datetime import datetime
@@ -8,12 +8,36 @@ class Todo(BaseModel):
     """Todo ORM Model with deadline and tags"""
     __tablename__ = "todos"
     
-    title = Column(String(100), nullable=False, index=True)
+    title = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    is_done = Column(Boolean, default=False, index=True)
-    due_date = Column(DateTime, nullable=True, index=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    is_done = Column(Boolean, default=False)
+    due_date = Column(DateTime, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Numbers the rows of a multi-row INSERT so RETURNING ids can be matched to them
+    # (sort_by_parameter_order): SQLite does not return rows in VALUES order
+    _sentinel = insert_sentinel("_sentinel")
     
-    # Relationships
-    owner = relationship("User", lazy="joined")
-    tags = relationship("Tag", secondary="todo_tag", back_populates="todos")
\ No newline at end of file
+    # Relationships: never loaded implicitly; TodoRepository reads columns and tag rows instead
+    owner = relationship("User", lazy="raise")
+    tags = relationship("Tag", secondary="todo_tag", back_populates="todos", lazy="raise", passive_deletes=True)
+    
+    # Every TodoRepository query filters by owner first: one composite index per query shape,
+    # so the owner's rows are found, filtered and ordered without a scan or a sort
+    __table_args__ = (
+        # Lists and keyset pages in created_at order; counts and exports by owner
+        Index("ix_todos_owner_created", "owner_id", "created_at", "id"),
+        # Overdue, today and the next-due lookup of the data version
+        Index("ix_todos_owner_done_due", "owner_id", "is_done", "due_date"),
+        # Lists filtered by is_done, in created_at order; sort=is_done,created_at
+        Index("ix_todos_owner_done_created", "owner_id", "is_done", "created_at"),
+        # sort=title / -title and updated_at / -updated_at, read forward or backward
+        Index("ix_todos_owner_title", "owner_id", "title", "id"),
+        Index("ix_todos_owner_updated", "owner_id", "updated_at", "id"),
+    )
+
+
+# sort=due_date and is_done,due_date,-created_at: due_date IS NULL ahead of due_date puts
+# undated todos after dated ones (SQLite sorts NULLs first)
+Index("ix_todos_owner_due", Todo.owner_id, Todo.due_date.is_(None), Todo.due_date, Todo.id)
+Index("ix_todos_owner_done_due_created", Todo.owner_id, Todo.is_done, Todo.due_date.is_(None), Todo.due_date,
+      Todo.created_at.desc(), Todo.id.desc())
\ No newline at end of file
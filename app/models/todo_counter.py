@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, ForeignKey
+from app.models.base import Base
+
+
+class TodoCounter(Base):
+    """Per-owner todo totals and data version, maintained by TodoRepository on every write"""
+    __tablename__ = "todo_counters"
+    
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=0)  # +1 on every write, for ETags
+    modified_at = Column(DateTime, nullable=True)  # time of the last write
+    
+    @property
+    def open(self) -> int:
+        return self.total - self.done
+    
+    def __repr__(self):
+        return f"<TodoCounter(owner_id={self.owner_id}, total={self.total}, done={self.done}, version={self.version})>"
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, exists, func, insert, literal, select, true, update
+from sqlalchemy.orm import Session
+from app.models.todo import Todo as TodoModel
+from app.models.todo_counter import TodoCounter
+from app.repositories.upsert import upsert_insert
+
+
+class TodoCounterRepository:
+    """Per-owner todo counters (total, done) and data version, kept in step with todo writes"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _recount(self, owner_id: int, modified_at=None):
+        """SELECT owner_id, total, done, version, modified_at computed from the todos table"""
+        return select(
+            literal(owner_id),
+            func.count(TodoModel.id),
+            func.coalesce(func.sum(case((TodoModel.is_done == True, 1), else_=0)), 0),
+            literal(0 if modified_at is None else 1),
+            literal(modified_at, TodoCounter.modified_at.type),
+        ).where(TodoModel.owner_id == owner_id)
+    
+    def _seed(self, owner_id: int, modified_at):
+        """SELECT of a first counter row: counts from the todos table when the owner has no row yet,
+        zeros (unused: the insert becomes an update) when it has, so the usual write counts nothing"""
+        known = exists().where(TodoCounter.owner_id == owner_id)
+        owned = select(func.count(TodoModel.id)).where(TodoModel.owner_id == owner_id)
+        return select(
+            literal(owner_id),
+            case((known, 0), else_=owned.scalar_subquery()),
+            case((known, 0), else_=owned.where(TodoModel.is_done == True).scalar_subquery()),
+            literal(1),
+            literal(modified_at, TodoCounter.modified_at.type),
+        ).where(true())  # SQLite needs a WHERE to tell INSERT ... SELECT from ON CONFLICT
+    
+    def get(self, owner_id: int) -> TodoCounter:
+        """Get the owner's counters (a primary-key lookup)"""
+        row = self.db.execute(
+            select(TodoCounter.total, TodoCounter.done, TodoCounter.version, TodoCounter.modified_at)
+            .where(TodoCounter.owner_id == owner_id)
+        ).first()
+        if row is None:
+            # Owner has not written since counters were introduced: count once, without writing
+            _, total, done, version, modified_at = self.db.execute(self._recount(owner_id)).one()
+            return TodoCounter(owner_id=owner_id, total=total, done=done, version=version, modified_at=modified_at)
+        return TodoCounter(owner_id=owner_id, total=row.total, done=row.done,
+                           version=row.version, modified_at=row.modified_at)
+    
+    def total_of(self, owner_id: int, is_done: Optional[bool] = None):
+        """Scalar subquery of the owner's todo count from the counters (done or open todos with is_done),
+        NULL when the owner has no counter row"""
+        column = TodoCounter.total if is_done is None else (
+            TodoCounter.done if is_done else TodoCounter.total - TodoCounter.done)
+        return select(column).where(TodoCounter.owner_id == owner_id).scalar_subquery()
+    
+    def bump(self, owner_id: int, total: int = 0, done: int = 0):
+        """Apply deltas and bump the data version in the current transaction (call after the todo change is flushed)
+
+        One INSERT ... ON CONFLICT DO UPDATE: a first write seeds the row from the todos table (which
+        already includes this change), and two first writes at once cannot both insert it.
+        """
+        now = datetime.utcnow()
+        dialect_insert = upsert_insert(self.db)
+        if dialect_insert is not None:
+            statement = dialect_insert(TodoCounter).from_select(
+                ["owner_id", "total", "done", "version", "modified_at"], self._seed(owner_id, now)
+            )
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=["owner_id"],
+                set_={"total": TodoCounter.total + total, "done": TodoCounter.done + done,
+                      "version": TodoCounter.version + 1, "modified_at": now},
+            ))
+            return
+        result = self.db.execute(
+            update(TodoCounter)
+            .where(TodoCounter.owner_id == owner_id)
+            .values(total=TodoCounter.total + total, done=TodoCounter.done + done,
+                    version=TodoCounter.version + 1, modified_at=now)
+        )
+        if result.rowcount == 0:
+            # First write for this owner: seed the row from the todos table, which already includes this change
+            self.db.execute(
+                insert(TodoCounter).from_select(
+                    ["owner_id", "total", "done", "version", "modified_at"], self._recount(owner_id, now)
+                )
+            )
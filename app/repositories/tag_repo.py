@@ -1,8 +1,170 @@
-# Tag repository
-# Will be implemented in Level 6
+from typing import Dict, Iterable, List, NamedTuple
+from sqlalchemy import delete, event, insert, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.tag import Tag as TagModel, todo_tag_association
+from app.repositories.upsert import upsert_insert
+from app.utils.cache import LRUCache
 
-# from sqlalchemy.orm import Session
-# from app.models.tag import Tag
+# Process-wide tag name -> id cache; tags are never renamed or deleted, so entries stay valid.
+# Only committed ids go in: resolve() stages what it finds in the session until it commits
+tag_id_cache = LRUCache(maxsize=settings.tag_cache_size)
 
-# TODO: Implement in Level 6
-pass
\ No newline at end of file
+# session.info key of the name -> id pairs resolved in the session's current transaction
+PENDING_TAG_IDS = "pending_tag_ids"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_tag_ids(session):
+    """Cache the ids a committed transaction resolved: they now exist for every session"""
+    for name, tag_id in session.info.pop(PENDING_TAG_IDS, {}).items():
+        tag_id_cache.set(name, tag_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tag_ids(session, previous_transaction):
+    """Drop ids resolved in a transaction (or savepoint) that rolled back: they may not exist"""
+    session.info.pop(PENDING_TAG_IDS, None)
+
+
+class TagRow(NamedTuple):
+    """A tag as returned with a todo"""
+    id: int
+    name: str
+
+
+class TagRepository:
+    """Tag resolution and todo_tag writes in a constant number of statements"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lookup(self, names: List[str]) -> Dict[str, int]:
+        """One SELECT id, name FROM tags WHERE name IN (...)"""
+        rows = self.db.execute(select(TagModel.name, TagModel.id).where(TagModel.name.in_(names)))
+        return {name: tag_id for name, tag_id in rows}
+
+    def _insert_new(self, names: List[str]) -> Dict[str, int]:
+        """One INSERT ... ON CONFLICT DO NOTHING RETURNING of the names: the ids of those it created
+        (names that already exist are skipped and not returned)"""
+        dialect_insert = upsert_insert(self.db)
+        rows = self.db.execute(
+            dialect_insert(TagModel).on_conflict_do_nothing(index_elements=["name"])
+            .returning(TagModel.name, TagModel.id),
+            [{"name": name} for name in names],
+        )
+        return {name: tag_id for name, tag_id in rows}
+
+    def resolve(self, names: Iterable[str]) -> List[int]:
+        """Map tag names to ids, creating missing tags. Returns ids in first-seen order, without duplicates
+
+        Names not in tag_id_cache are inserted first where the dialect has ON CONFLICT: new tags
+        then cost one statement, and only names that already existed are looked up afterwards.
+        """
+        names = list(dict.fromkeys(names))
+        ids = {}
+        misses = []
+        for name in names:
+            tag_id = tag_id_cache.get(name)
+            if tag_id is None:
+                misses.append(name)
+            else:
+                ids[name] = tag_id
+
+        if misses:
+            if upsert_insert(self.db) is not None:
+                found = self._insert_new(misses)
+                existing = [name for name in misses if name not in found]
+                if existing:
+                    found.update(self._lookup(existing))
+            else:
+                found = self._lookup(misses)
+                missing = [name for name in misses if name not in found]
+                if missing:
+                    self.db.execute(insert(TagModel), [{"name": name} for name in missing])
+                    found.update(self._lookup(missing))
+            # Cached once the transaction commits: the lookup also sees tags this transaction
+            # created, which only exist if it commits
+            self.db.info.setdefault(PENDING_TAG_IDS, {}).update(found)
+            ids.update(found)
+        return [ids[name] for name in names]
+
+    def names_by_todo(self, todo_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """Tag names of several todos in one query, each todo's sorted by name"""
+        return {
+            todo_id: [tag.name for tag in tags]
+            for todo_id, tags in self.rows_by_todo(todo_ids).items()
+        }
+
+    def rows_by_todo(self, todo_ids: Iterable[int]) -> Dict[int, List[TagRow]]:
+        """Tags of several todos in one query, as plain rows, each todo's sorted by name"""
+        rows = self.db.execute(
+            select(todo_tag_association.c.todo_id, TagModel.id, TagModel.name)
+            .join(TagModel, TagModel.id == todo_tag_association.c.tag_id)
+            .where(todo_tag_association.c.todo_id.in_(list(todo_ids)))
+        )
+        tags = {}
+        for todo_id, tag_id, name in rows:
+            tags.setdefault(todo_id, []).append(TagRow(tag_id, name))
+        # Sorted here: ORDER BY name would add a temp B-tree sort to the primary-key lookup
+        for todo_tags in tags.values():
+            todo_tags.sort(key=lambda tag: tag.name)
+        return tags
+
+    def join_tags(self, statement, todo_id_column):
+        """A SELECT of todos with each todo's tags outer-joined as tag_id and tag_name columns:
+        one row per tag, or a single row with NULL tag columns for a todo without tags"""
+        return (
+            statement.add_columns(TagModel.id.label("tag_id"), TagModel.name.label("tag_name"))
+            .outerjoin(todo_tag_association, todo_tag_association.c.todo_id == todo_id_column)
+            .outerjoin(TagModel, TagModel.id == todo_tag_association.c.tag_id)
+        )
+
+    @staticmethod
+    def joined_rows(rows) -> List[TagRow]:
+        """The tags in the rows of one todo from a join_tags() SELECT, sorted by name"""
+        tags = [TagRow(row.tag_id, row.tag_name) for row in rows if row.tag_id is not None]
+        tags.sort(key=lambda tag: tag.name)
+        return tags
+
+    def clear_todo_tags(self, todo_ids: Iterable[int]):
+        """Remove every tag link of the given todos in one DELETE"""
+        self.db.execute(delete(todo_tag_association).where(todo_tag_association.c.todo_id.in_(list(todo_ids))))
+
+    def set_todo_tags(self, todo_id: int, names: Iterable[str], replace: bool = False) -> List[TagRow]:
+        """Attach tags to a todo (replace=True makes them its whole tag set). Returns its new tags"""
+        return self.set_tags_many({todo_id: names}, replace=replace).get(todo_id, [])
+
+    def set_tags_many(self, tags_by_todo: Dict[int, Iterable[str]], replace: bool = False) -> Dict[int, List[TagRow]]:
+        """Attach tags to several todos: one resolve for all names, one executemany for all links.
+
+        replace=True diffs against the current links as sets: one DELETE of the links not
+        wanted any more and one INSERT that skips those already there (dialects without
+        ON CONFLICT clear every link first). Returns each todo's new tags, sorted by name
+        as reads return them, so a write's response matches a later read of the same todo.
+        """
+        if not tags_by_todo:
+            return {}
+        tags_by_todo = {todo_id: list(dict.fromkeys(names)) for todo_id, names in tags_by_todo.items()}
+        all_names = list(dict.fromkeys(name for names in tags_by_todo.values() for name in names))
+        tag_ids = dict(zip(all_names, self.resolve(all_names)))
+        links = [
+            {"todo_id": todo_id, "tag_id": tag_ids[name]}
+            for todo_id, names in tags_by_todo.items()
+            for name in names
+        ]
+        statement = insert(todo_tag_association)
+        if replace:
+            dialect_insert = upsert_insert(self.db)
+            stale = delete(todo_tag_association).where(todo_tag_association.c.todo_id.in_(list(tags_by_todo)))
+            if dialect_insert is not None and links:
+                pair = tuple_(todo_tag_association.c.todo_id, todo_tag_association.c.tag_id)
+                stale = stale.where(pair.not_in([(link["todo_id"], link["tag_id"]) for link in links]))
+                statement = dialect_insert(todo_tag_association).on_conflict_do_nothing()
+            self.db.execute(stale)
+        if links:
+            self.db.execute(statement, links)
+        return {
+            todo_id: [TagRow(tag_ids[name], name) for name in sorted(names)]
+            for todo_id, names in tags_by_todo.items()
+        }
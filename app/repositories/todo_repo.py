@@ -1,10 +1,97 @@
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_, and_
+from sqlalchemy import case, delete, desc, func, insert, or_, and_, select, update
+from sqlalchemy.sql.elements import BinaryExpression
 from datetime import datetime, date
 from app.models.todo import Todo as TodoModel
-from app.models.tag import Tag as TagModel
-from app.schemas.todo import TodoCreate, TodoUpdate
+from app.core.data_version import DataVersion, data_versions
+from app.core.replicas import replica_router
+from app.core.search import fts_enabled, fts_worthwhile, match_expression, match_ids, match_ranked
+from app.repositories.counter_repo import TodoCounterRepository
+from app.repositories.tag_repo import TagRepository, TagRow
+from app.schemas.todo import DEFAULT_SORT, TODO_SORTS, TodoBatchUpdate, TodoCreate, TodoUpdate
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_condition
+
+
+class TodoRow(NamedTuple):
+    """A todo as returned to clients: the selected columns and its tags, not an ORM entity.
+
+    Fields left out of a sparse fieldset are None.
+    """
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    is_done: Optional[bool] = None
+    due_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    tags: Optional[List[TagRow]] = None
+
+
+class TodoPage(NamedTuple):
+    """One page of todos"""
+    items: List[TodoRow]
+    total: int
+    next_cursor: Optional[str] = None
+    estimated: bool = False  # total is an upper bound from the counters, not an exact count
+
+
+class TodoBatch(NamedTuple):
+    """Outcome of a batch of changes"""
+    created: List[TodoRow]
+    found: Set[int]  # ids among updates/completes/deletes that exist and belong to the owner
+    todos: Dict[int, TodoRow]  # created, updated and completed todos as committed, by id
+
+
+# Columns of a TodoRow: what reads select and single-todo writes return
+ROW_COLUMNS = (
+    TodoModel.id, TodoModel.title, TodoModel.description, TodoModel.is_done,
+    TodoModel.due_date, TodoModel.created_at, TodoModel.updated_at,
+)
+
+# Columns streamed by export, in output order (tags are added per chunk)
+EXPORT_COLUMNS = ROW_COLUMNS
+
+# Sort keys as the columns that order them ascending; due_date IS NULL puts undated todos last
+SORT_KEYS = {
+    "created_at": [TodoModel.created_at],
+    "updated_at": [TodoModel.updated_at],
+    "title": [TodoModel.title],
+    "is_done": [TodoModel.is_done],
+    "due_date": [TodoModel.due_date.is_(None), TodoModel.due_date],
+}
+
+
+def _ordering(sort: str) -> list:
+    """(column, descending) pairs of a sort such as "is_done,due_date,-created_at".
+
+    id is appended as the tie-breaker, in the direction of the last key: that is the
+    order of the sort's index (ix_todos_owner_*), read forward or backward.
+    """
+    order_by = []
+    for key in sort.split(","):
+        descending = key.startswith("-")
+        order_by += [(column, descending) for column in SORT_KEYS[key.lstrip("-")]]
+    return order_by + [(TodoModel.id, order_by[-1][1])]
+
+
+def _row_column(column):
+    """The row column an ordering column reads (the tested column, for an IS NULL key)"""
+    return column.left if isinstance(column, BinaryExpression) else column
+
+
+def _sort_value(row, column):
+    """A row's value of an ordering column (whether it is NULL, for an IS NULL key)"""
+    value = getattr(row, _row_column(column).key)
+    return value is None if isinstance(column, BinaryExpression) else value
+
+
+# Orderings as (column, descending) pairs, by cursor key; id is the tie-breaker that makes keyset
+# seeks exact. "due" orders overdue and today's todos, which all have a due_date.
+ORDERINGS = {
+    **{sort: _ordering(sort) for sort in TODO_SORTS},
+    "due": [(TodoModel.due_date, False), (TodoModel.id, False)],
+}
 
 
 class TodoRepository:
@@ -12,41 +99,133 @@ class TodoRepository:
     
     def __init__(self, db: Session):
         self.db = db
+        self.counters = TodoCounterRepository(db)
+        self.tags = TagRepository(db)
     
-    def create(self, todo: TodoCreate, owner_id: int) -> TodoModel:
-        """Create a new todo"""
-        db_todo = TodoModel(
-            title=todo.title,
-            description=todo.description,
-            is_done=todo.is_done,
-            due_date=todo.due_date,
-            owner_id=owner_id
-        )
+    def create(self, todo: TodoCreate, owner_id: int) -> TodoRow:
+        """Create a new todo: INSERT ... RETURNING, its tag links and the counters, then one commit"""
+        now = datetime.utcnow()
+        row = self.db.execute(
+            insert(TodoModel)
+            .values(title=todo.title, description=todo.description, is_done=todo.is_done,
+                    due_date=todo.due_date, owner_id=owner_id, created_at=now, updated_at=now)
+            .returning(*ROW_COLUMNS)
+        ).one()
         
-        # Add tags if provided
-        if todo.tags:
-            for tag_name in todo.tags:
-                tag = self.db.query(TagModel).filter(TagModel.name == tag_name).first()
-                if not tag:
-                    tag = TagModel(name=tag_name)
-                    self.db.add(tag)
-                db_todo.tags.append(tag)
+        # Add tags if provided: one lookup, one insert of new tags, one executemany of links
+        tags = self.tags.set_todo_tags(row.id, todo.tags) if todo.tags else []
         
-        self.db.add(db_todo)
+        self.counters.bump(owner_id, total=1, done=int(bool(row.is_done)))
+        self._commit(owner_id)
+        return TodoRow(*row, tags)
+    
+    def _commit(self, owner_id: int):
+        """Commit a write, drop the owner's cached data version and pin their reads to the primary"""
         self.db.commit()
-        self.db.refresh(db_todo)
-        return db_todo
+        data_versions.invalidate(owner_id)
+        replica_router.note_write(owner_id)
     
-    def get_all(self, 
-               owner_id: int,
-               is_done: Optional[bool] = None, 
-               q: Optional[str] = None, 
-               sort: Optional[str] = None,
-               limit: int = 10,
-               offset: int = 0) -> tuple[List[TodoModel], int]:
-        """Get todos for user with filtering, searching and sorting. Returns (items, total)"""
-        query = self.db.query(TodoModel)
+    def data_version(self, owner_id: int) -> DataVersion:
+        """The owner's data version, last write time and next overdue boundary (two indexed lookups)"""
+        counter = self.counters.get(owner_id)
+        next_due = self.db.execute(
+            select(func.min(TodoModel.due_date)).where(
+                TodoModel.owner_id == owner_id,
+                TodoModel.is_done == False,
+                TodoModel.due_date >= datetime.now()
+            )
+        ).scalar()
+        return DataVersion(counter.version, counter.modified_at, next_due)
+    
+    def _owned(self, statement, todo_id: int, owner_id: int):
+        """Scope an UPDATE, DELETE or SELECT to one todo of the owner"""
+        return statement.where(TodoModel.id == todo_id, TodoModel.owner_id == owner_id)
+    
+    def _returning(self, statement):
+        """Run an UPDATE ... RETURNING the row columns; the row, or None when nothing matched"""
+        return self.db.execute(
+            statement.returning(*ROW_COLUMNS).execution_options(synchronize_session=False)
+        ).first()
+    
+    def _tags_of(self, todo_id: int) -> List[TagRow]:
+        return self.tags.rows_by_todo([todo_id]).get(todo_id, [])
+    
+    def _columns(self, fields: Optional[Tuple[str, ...]], *keys: str) -> tuple:
+        """ROW_COLUMNS narrowed to a sparse fieldset, plus id and the given keys (what cursors are made of)"""
+        if fields is None:
+            return ROW_COLUMNS
+        wanted = set(fields) | {"id", *keys}
+        return tuple(column for column in ROW_COLUMNS if column.key in wanted)
+    
+    def _with_tags(self, rows, fields: Optional[Tuple[str, ...]] = None,
+                   tags: Optional[Dict[int, List[TagRow]]] = None) -> List[TodoRow]:
+        """TodoRows for selected rows, with the tags of all of them from one keyed query
+        (unless tags, by todo id, were already read along with the rows).
+
+        With a sparse fieldset the rows hold only the _columns() it selected, and the
+        tags query runs only when tags were asked for. Columns after those are ignored.
+        """
+        if not rows:
+            return []
+        if tags is None:
+            tags = {}
+            if fields is None or "tags" in fields:
+                tags = self.tags.rows_by_todo([row.id for row in rows])
+        if fields is None:
+            return [TodoRow(*row[:len(ROW_COLUMNS)], tags.get(row.id, [])) for row in rows]
+        return [
+            TodoRow(**{key: value for key, value in row._mapping.items() if key in TodoRow._fields},
+                    tags=tags.get(row.id, []))
+            for row in rows
+        ]
+    
+    def _count(self, statement) -> int:
+        """SELECT count(*) over a select() of todos"""
+        return self.db.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar()
+    
+    def _paginate(self, query, sort: str, limit: int, offset: int, cursor: Optional[str], order_by=None,
+                  keyset: bool = True, fields: Optional[Tuple[str, ...]] = None, total=None):
+        """Order and page a select() of _columns(fields), by offset or by keyset cursor.
+        Returns (items, next_cursor, more, total): more is whether rows follow this page
+
+        order_by defaults to ORDERINGS[sort]. One that is not part of the row (e.g. search relevance)
+        pages by offset only: keyset=False. total, a scalar subquery, is selected along with the
+        page (saving its own round trip) and returned: None when it is NULL or the page is empty.
+        """
+        order_by = order_by or ORDERINGS[sort]
+        if cursor:
+            if not keyset:
+                raise InvalidCursor(f"Cursor pagination is not available for sort={sort}")
+            # Keyset seek: continue right after the last row of the previous page
+            query = query.filter(keyset_condition(order_by, decode_cursor(cursor, sort)))
+        query = query.order_by(*[desc(column) if descending else column for column, descending in order_by])
+        if not cursor:
+            query = query.offset(offset)
         
+        if total is not None:
+            query = query.add_columns(total.label("page_total"))
+        
+        # Fetch one extra row to know whether another page exists
+        rows = self.db.execute(query.limit(limit + 1)).all()
+        if total is not None:
+            total = rows[0].page_total if rows else None
+        next_cursor = None
+        more = len(rows) > limit
+        if more:
+            rows = rows[:limit]
+            if keyset:
+                last = rows[-1]
+                next_cursor = encode_cursor(sort, [_sort_value(last, column) for column, _ in order_by])
+        return self._with_tags(rows, fields), next_cursor, more, total
+    
+    def _filter(self, query, owner_id: int, is_done: Optional[bool], q: Optional[str], ranked: bool = False,
+                fts: bool = False):
+        """Apply the owner, is_done and q filters to a select(). Returns (query, relevance)
+
+        q uses the full-text index when fts is set (see fts_worthwhile), else LIKE over the owner's rows.
+        relevance, when ranked, is the bm25 score column, or with LIKE title matches ahead of
+        description matches; else None.
+        """
         # Filter by owner
         query = query.filter(TodoModel.owner_id == owner_id)
         
@@ -55,111 +234,290 @@ class TodoRepository:
             query = query.filter(TodoModel.is_done == is_done)
         
         # Search by title or description keyword
+        relevance = None
         if q:
-            query = query.filter(
-                or_(
-                    TodoModel.title.ilike(f"%{q}%"),
-                    TodoModel.description.ilike(f"%{q}%")
+            expression = match_expression(q) if fts else None
+            if expression and ranked:
+                # Full-text index, ranked: join the bm25 scores of the owner's matches
+                match = match_ranked(expression, owner_id)
+                query = query.join(match, match.c.rowid == TodoModel.id)
+                relevance = match.c.score
+            elif expression:
+                # Full-text index: every word as a prefix match, among the owner's rows
+                query = query.filter(TodoModel.id.in_(match_ids(expression, owner_id)))
+            else:
+                query = query.filter(
+                    or_(
+                        TodoModel.title.ilike(f"%{q}%"),
+                        TodoModel.description.ilike(f"%{q}%")
+                    )
                 )
-            )
-        
-        # Get total count before pagination
-        total = query.count()
+                if ranked:
+                    relevance = case((TodoModel.title.ilike(f"%{q}%"), 0), else_=1)
+        return query, relevance
+    
+    def get_all(self, 
+               owner_id: int,
+               is_done: Optional[bool] = None, 
+               q: Optional[str] = None, 
+               sort: Optional[str] = None,
+               limit: int = 10,
+               offset: int = 0,
+               cursor: Optional[str] = None,
+               include_total: bool = True,
+               fields: Optional[Tuple[str, ...]] = None) -> TodoPage:
+        """Get todos for user with filtering, searching and sorting. Returns (items, total, next_cursor, estimated)
+
+        sort is one of TODO_SORTS, or relevance (full-text searches; else the default, newest first).
+        fields narrows the selected columns and the items to a sparse fieldset.
+        """
+        ordering = DEFAULT_SORT if sort in (None, "relevance") else sort
+        if ordering not in TODO_SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        columns = self._columns(fields, *[_row_column(column).key for column, _ in ORDERINGS[ordering]])
+        # The owner's counters give the size of the set a search has to cover, and the total
+        # unless a search is counted: selected along with the page when not read up front
+        counter = self.counters.get(owner_id) if q and fts_enabled() else None
+        fts = counter is not None and fts_worthwhile(counter.total)
+        counted = counter is None and not (q and include_total)
+        total = self.counters.total_of(owner_id, is_done) if counted else None
+        query, relevance = self._filter(select(*columns), owner_id, is_done, q, ranked=sort == "relevance", fts=fts)
         
-        # Sort by created_at
-        if sort == "created_at":
-            query = query.order_by(TodoModel.created_at)
-        elif sort == "-created_at":
-            query = query.order_by(desc(TodoModel.created_at))
+        # Sort by relevance (searches only), else in the order of one of the owner's indexes
+        if sort == "relevance" and relevance is not None:
+            items, next_cursor, more, total = self._paginate(query, sort, limit, offset, cursor,
+                                                             order_by=[(relevance, False), (TodoModel.id, False)],
+                                                             keyset=False, fields=fields, total=total)
         else:
-            # Default: newest first
-            query = query.order_by(desc(TodoModel.created_at))
+            # Filtered by is_done, is_done is constant: leaving it out of the keyset seek (and the cursor)
+            # lets SQLite seek the index's is_done = ? range rather than sort what follows it
+            order_by = ORDERINGS[ordering]
+            if is_done is not None:
+                order_by = [(column, descending) for column, descending in order_by
+                            if column is not TodoModel.is_done]
+            items, next_cursor, more, total = self._paginate(query, ordering, limit, offset, cursor,
+                                                             order_by=order_by, fields=fields, total=total)
         
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        
-        return query.all(), total
+        # Total: O(1) from the owner's counters unless a search must be counted. The last page of
+        # an offset-paged search gives its count away; otherwise counting runs the search again
+        if q and include_total:
+            last_page = not more and not cursor and (items or not offset)
+            return TodoPage(items, offset + len(items) if last_page else self._count(query), next_cursor)
+        if total is None:
+            # Empty page, or no counter row yet
+            counter = counter or self.counters.get(owner_id)
+            total = counter.total if is_done is None else (counter.done if is_done else counter.open)
+        return TodoPage(items, total, next_cursor, estimated=bool(q))
     
-    def get_by_id(self, todo_id: int, owner_id: int) -> Optional[TodoModel]:
-        """Get todo by ID and verify ownership"""
-        return self.db.query(TodoModel).filter(
-            TodoModel.id == todo_id,
-            TodoModel.owner_id == owner_id
-        ).first()
+    def export_statement(self, owner_id: int, is_done: Optional[bool] = None, q: Optional[str] = None):
+        """SELECT of the export columns with get_all's filters, oldest first (for streaming, not paging)
+
+        created_at, id is the owner indexes' order, so rows stream without a sort.
+        """
+        fts = bool(q) and fts_enabled() and fts_worthwhile(self.counters.get(owner_id).total)
+        statement, _ = self._filter(select(*EXPORT_COLUMNS), owner_id, is_done, q, fts=fts)
+        return statement.order_by(*[column for column, _ in ORDERINGS["created_at"]])
     
-    def update(self, todo_id: int, todo_update: TodoUpdate, owner_id: int) -> Optional[TodoModel]:
-        """Update todo - verify ownership"""
-        db_todo = self.get_by_id(todo_id, owner_id)
-        if not db_todo:
+    def get_by_id(self, todo_id: int, owner_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[TodoRow]:
+        """Get todo by ID and verify ownership (fields: a sparse fieldset). One query: its tags are joined"""
+        statement = self._owned(select(*self._columns(fields)), todo_id, owner_id)
+        if fields is not None and "tags" not in fields:
+            row = self.db.execute(statement).first()
+            return None if row is None else self._with_tags([row], fields)[0]
+        rows = self.db.execute(self.tags.join_tags(statement, TodoModel.id)).all()
+        if not rows:
             return None
+        return self._with_tags(rows[:1], fields, tags={todo_id: self.tags.joined_rows(rows)})[0]
+    
+    def update(self, todo_id: int, todo_update: TodoUpdate, owner_id: int) -> Optional[TodoRow]:
+        """Update todo - verify ownership: an UPDATE ... RETURNING scoped to the owner; None when no row matched"""
+        values = todo_update.model_dump(exclude={"tags"}, exclude_none=True)
+        statement = self._owned(update(TodoModel), todo_id, owner_id).values(**values, updated_at=datetime.utcnow())
         
-        if todo_update.title is not None:
-            db_todo.title = todo_update.title
-        if todo_update.description is not None:
-            db_todo.description = todo_update.description
-        if todo_update.is_done is not None:
-            db_todo.is_done = todo_update.is_done
-        if todo_update.due_date is not None:
-            db_todo.due_date = todo_update.due_date
+        row = None
+        done_delta = 0
+        if "is_done" in values:
+            # Only matches when is_done flips, which gives the counter delta without reading the row first
+            row = self._returning(statement.where(TodoModel.is_done != values["is_done"]))
+            if row is not None:
+                done_delta = 1 if values["is_done"] else -1
+        if row is None:
+            row = self._returning(statement)
+            if row is None:
+                return None
         
-        # Update tags if provided
+        # Replace tags if provided (a set-based diff), else read the current ones for the response
         if todo_update.tags is not None:
-            db_todo.tags = []
-            for tag_name in todo_update.tags:
-                tag = self.db.query(TagModel).filter(TagModel.name == tag_name).first()
-                if not tag:
-                    tag = TagModel(name=tag_name)
-                    self.db.add(tag)
-                db_todo.tags.append(tag)
+            tags = self.tags.set_todo_tags(todo_id, todo_update.tags, replace=True)
+        else:
+            tags = self._tags_of(todo_id)
         
-        self.db.commit()
-        self.db.refresh(db_todo)
-        return db_todo
+        self.counters.bump(owner_id, done=done_delta)
+        self._commit(owner_id)
+        return TodoRow(*row, tags)
     
     def delete(self, todo_id: int, owner_id: int) -> bool:
-        """Delete todo - verify ownership"""
-        db_todo = self.get_by_id(todo_id, owner_id)
-        if not db_todo:
+        """Delete todo - verify ownership: DELETE ... RETURNING scoped to the owner; False when no row matched"""
+        row = self.db.execute(
+            self._owned(delete(TodoModel), todo_id, owner_id)
+            .returning(TodoModel.is_done)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
             return False
         
-        self.db.delete(db_todo)
-        self.db.commit()
+        # SQLite does not enforce the links' ON DELETE CASCADE
+        self.tags.clear_todo_tags([todo_id])
+        self.counters.bump(owner_id, total=-1, done=-int(bool(row.is_done)))
+        self._commit(owner_id)
         return True
     
-    def mark_complete(self, todo_id: int, owner_id: int) -> Optional[TodoModel]:
-        """Mark todo as complete - verify ownership"""
-        db_todo = self.get_by_id(todo_id, owner_id)
-        if not db_todo:
-            return None
+    def mark_complete(self, todo_id: int, owner_id: int) -> Optional[TodoRow]:
+        """Mark todo as complete - verify ownership: an UPDATE ... RETURNING of the owner's open todo"""
+        row = self._returning(
+            self._owned(update(TodoModel), todo_id, owner_id)
+            .where(TodoModel.is_done == False)
+            .values(is_done=True, updated_at=datetime.utcnow())
+        )
+        if row is None:
+            # Already complete (nothing to write) or not the owner's
+            row = self.db.execute(self._owned(select(*ROW_COLUMNS), todo_id, owner_id)).first()
+            return None if row is None else TodoRow(*row, self._tags_of(todo_id))
         
-        db_todo.is_done = True
-        self.db.commit()
-        self.db.refresh(db_todo)
-        return db_todo
+        tags = self._tags_of(todo_id)
+        self.counters.bump(owner_id, done=1)
+        self._commit(owner_id)
+        return TodoRow(*row, tags)
+    
+    def _insert_many(self, creates: List[TodoCreate], owner_id: int, now: datetime) -> List[int]:
+        """Insert todos and their tag links without committing. Returns the new ids in creates order"""
+        if not creates:
+            return []
+        # Multi-row INSERT ... RETURNING id. RETURNING rows come in no guaranteed order:
+        # sort_by_parameter_order has SQLAlchemy hand the ids back in creates order
+        created_ids = self.db.scalars(
+            insert(TodoModel).returning(TodoModel.id, sort_by_parameter_order=True),
+            [
+                {"title": todo.title, "description": todo.description, "is_done": todo.is_done,
+                 "due_date": todo.due_date, "owner_id": owner_id, "created_at": now, "updated_at": now}
+                for todo in creates
+            ],
+        ).all()
+        self.tags.set_tags_many({todo_id: todo.tags for todo_id, todo in zip(created_ids, creates) if todo.tags})
+        return created_ids
+    
+    def create_many(self, creates: List[TodoCreate], owner_id: int) -> int:
+        """Insert todos in a few set-based statements and one commit. Returns how many"""
+        created_ids = self._insert_many(creates, owner_id, datetime.utcnow())
+        self.counters.bump(owner_id, total=len(created_ids), done=sum(bool(todo.is_done) for todo in creates))
+        self._commit(owner_id)
+        return len(created_ids)
+    
+    def batch(self,
+              owner_id: int,
+              creates: List[TodoCreate] = (),
+              updates: List[TodoBatchUpdate] = (),
+              completes: List[int] = (),
+              deletes: List[int] = ()) -> TodoBatch:
+        """Apply creates, updates, completes and deletes with set-based statements and one commit"""
+        now = datetime.utcnow()
+        
+        # One lookup of every referenced todo the owner has, with its current is_done
+        referenced = {u.id for u in updates} | set(completes) | set(deletes)
+        done_before = {}
+        if referenced:
+            done_before = dict(self.db.execute(
+                select(TodoModel.id, TodoModel.is_done)
+                .where(TodoModel.owner_id == owner_id, TodoModel.id.in_(referenced))
+            ).all())
+        done_after = {todo_id: bool(done) for todo_id, done in done_before.items()}
+        
+        created_ids = self._insert_many(creates, owner_id, now)
+        
+        # UPDATE ... WHERE id = ? as one executemany per set of changed columns
+        updates = [u for u in updates if u.id in done_before]
+        rows = []
+        for u in updates:
+            values = u.model_dump(exclude={"id", "tags"}, exclude_none=True)
+            if "is_done" in values:
+                done_after[u.id] = values["is_done"]
+            rows.append({"id": u.id, "updated_at": now, **values})
+        if rows:
+            self.db.execute(update(TodoModel), rows)
+        
+        self.tags.set_tags_many({u.id: u.tags for u in updates if u.tags is not None}, replace=True)
+        
+        # UPDATE ... WHERE id IN (...) AND owner_id = ?
+        to_complete = [todo_id for todo_id in dict.fromkeys(completes) if todo_id in done_before]
+        if to_complete:
+            self.db.execute(
+                update(TodoModel)
+                .where(TodoModel.owner_id == owner_id, TodoModel.id.in_(to_complete), TodoModel.is_done == False)
+                .values(is_done=True, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            done_after.update(dict.fromkeys(to_complete, True))
+        
+        # DELETE ... WHERE id IN (...) AND owner_id = ?
+        to_delete = [todo_id for todo_id in dict.fromkeys(deletes) if todo_id in done_before]
+        if to_delete:
+            self.tags.clear_todo_tags(to_delete)
+            self.db.execute(
+                delete(TodoModel)
+                .where(TodoModel.owner_id == owner_id, TodoModel.id.in_(to_delete))
+                .execution_options(synchronize_session=False)
+            )
+            for todo_id in to_delete:
+                del done_after[todo_id]
+        
+        done_delta = sum(done_after.values()) - sum(bool(done) for done in done_before.values())
+        self.counters.bump(owner_id,
+                           total=len(created_ids) - len(to_delete),
+                           done=done_delta + sum(bool(todo.is_done) for todo in creates))
+        self._commit(owner_id)
+        
+        # Read back everything that still exists, with tags, in one query (+ one for tags)
+        touched = set(created_ids) | {u.id for u in updates} | set(to_complete)
+        touched -= set(to_delete)
+        todos = {}
+        if touched:
+            rows = self.db.execute(select(*ROW_COLUMNS).where(TodoModel.id.in_(touched))).all()
+            todos = {todo.id: todo for todo in self._with_tags(rows)}
+        return TodoBatch([todos[todo_id] for todo_id in created_ids], set(done_before), todos)
+    
+    def _list_total(self, query, owner_id: int, include_total: bool):
+        """Exact count of query, or the owner's open-todo count as an estimate. Returns (total, estimated)"""
+        if include_total:
+            return self._count(query), False
+        return self.counters.get(owner_id).open, True
     
-    def get_overdue(self, owner_id: int, limit: int = 10, offset: int = 0) -> tuple[List[TodoModel], int]:
+    def get_overdue(self, owner_id: int, limit: int = 10, offset: int = 0,
+                    cursor: Optional[str] = None, include_total: bool = True,
+                    fields: Optional[Tuple[str, ...]] = None) -> TodoPage:
         """Get overdue todos (past due_date and not done)"""
-        query = self.db.query(TodoModel).filter(
+        query = select(*self._columns(fields, "due_date")).where(
             TodoModel.owner_id == owner_id,
             TodoModel.is_done == False,
             TodoModel.due_date < datetime.now()
         )
         
-        total = query.count()
-        query = query.order_by(TodoModel.due_date).offset(offset).limit(limit)
-        return query.all(), total
+        total, estimated = self._list_total(query, owner_id, include_total)
+        items, next_cursor, _, _ = self._paginate(query, "due", limit, offset, cursor, fields=fields)
+        return TodoPage(items, total, next_cursor, estimated)
     
-    def get_today(self, owner_id: int, limit: int = 10, offset: int = 0) -> tuple[List[TodoModel], int]:
+    def get_today(self, owner_id: int, limit: int = 10, offset: int = 0,
+                  cursor: Optional[str] = None, include_total: bool = True,
+                  fields: Optional[Tuple[str, ...]] = None) -> TodoPage:
         """Get today's todos (due_date is today and not done)"""
         today_start = datetime.combine(date.today(), datetime.min.time())
         today_end = datetime.combine(date.today(), datetime.max.time())
         
-        query = self.db.query(TodoModel).filter(
+        query = select(*self._columns(fields, "due_date")).where(
             TodoModel.owner_id == owner_id,
             TodoModel.is_done == False,
             and_(TodoModel.due_date >= today_start, TodoModel.due_date <= today_end)
         )
         
-        total = query.count()
-        query = query.order_by(TodoModel.due_date).offset(offset).limit(limit)
-        return query.all(), total
\ No newline at end of file
+        total, estimated = self._list_total(query, owner_id, include_total)
+        items, next_cursor, _, _ = self._paginate(query, "due", limit, offset, cursor, fields=fields)
+        return TodoPage(items, total, next_cursor, estimated)
@@ -0,0 +1,13 @@
+import importlib
+
+# Modules with an INSERT ... ON CONFLICT, per dialect (imported when first used)
+UPSERT_INSERTS = {
+    "sqlite": "sqlalchemy.dialects.sqlite",
+    "postgresql": "sqlalchemy.dialects.postgresql",
+}
+
+
+def upsert_insert(db):
+    """The session's dialect's insert() with on_conflict_do_nothing/do_update, or None when it has none"""
+    module = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    return None if module is None else importlib.import_module(module).insert
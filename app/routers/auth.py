@@ -1,21 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.services.user_service import UserService
+from app.core.dependencies import get_current_user, get_user_service
+from app.services.user_service import AsyncUserService
 from app.services.auth_service import AuthService
 from app.schemas.auth import RegisterRequest, LoginRequest, AuthResponse, MeResponse, Token
-from app.models.user import User
+from app.core.principal_cache import Principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def get_user_service(db: Session = Depends(get_db)) -> UserService:
-    """Dependency to provide UserService"""
-    return UserService(db)
-
-
-def get_auth_service(user_service: UserService = Depends(get_user_service)) -> AuthService:
+def get_auth_service(user_service: AsyncUserService = Depends(get_user_service)) -> AuthService:
     """Dependency to provide AuthService"""
     return AuthService(user_service)
 
@@ -26,7 +19,7 @@ async def register(
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """Register a new user"""
-    user, error = auth_service.register(request.email, request.password)
+    user, error = await auth_service.register(request.email, request.password)
     
     if error:
         raise HTTPException(
@@ -62,7 +55,7 @@ async def login(
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """Login user and get access token"""
-    result, error = auth_service.login(request.email, request.password)
+    result, error = await auth_service.login(request.email, request.password)
     
     if error:
         raise HTTPException(
@@ -75,7 +68,7 @@ async def login(
 
 
 @router.get("/me", response_model=MeResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """Get current user information"""
     return {
         "id": current_user.id,
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
+from app.core.config import settings
+from app.core.data_version import data_versions
+from app.core.principal_cache import principal_cache
+from app.core.startup import import_breakdown, startup_timer
+from app.repositories.tag_repo import tag_id_cache
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -6,4 +11,22 @@ router = APIRouter(prefix="/health", tags=["health"])
 @router.get("")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Hit/miss counters of the in-process caches"""
+    return {
+        "principal": principal_cache.stats(),
+        "tags": tag_id_cache.stats(),
+        "data_version": data_versions.stats(),
+    }
+
+
+@router.get("/startup")
+def startup_report():
+    """Spawn-to-ready timings and an import-time breakdown of app.main (debug mode only)"""
+    if not settings.debug:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return {**startup_timer.report(), "imports": import_breakdown()}
@@ -0,0 +1,64 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.data_version import data_versions
+from app.core.database import engine, get_async_engine
+from app.core.hashing import hashing_executor
+from app.core.metrics import registry
+from app.core.principal_cache import principal_cache
+from app.core.replicas import replica_router
+from app.repositories.tag_repo import tag_id_cache
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@registry.collector
+def cache_metrics():
+    """Hit/miss counters of the in-process caches"""
+    stats = {
+        "principal": principal_cache.stats(),
+        "tags": tag_id_cache.stats(),
+        "data_version": data_versions.stats(),
+    }
+    return [
+        ("cache_hits_total", "counter", "Cache lookups that found an entry",
+         [({"cache": name}, cache["hits"]) for name, cache in stats.items()]),
+        ("cache_misses_total", "counter", "Cache lookups that found no entry",
+         [({"cache": name}, cache["misses"]) for name, cache in stats.items()]),
+        ("cache_hit_ratio", "gauge", "Hits over lookups since start",
+         [({"cache": name}, cache["hit_ratio"]) for name, cache in stats.items()]),
+        ("cache_entries", "gauge", "Entries currently cached",
+         [({"cache": name}, cache["size"]) for name, cache in stats.items()]),
+    ]
+
+
+@registry.collector
+def pool_metrics():
+    """Connections checked out of the pools requests use"""
+    pools = {"primary": get_async_engine().sync_engine.pool if settings.async_database else engine.pool}
+    for index, replica in enumerate(replica_router.replicas):
+        pools[f"replica{index}"] = (replica.async_engine.sync_engine if settings.async_database else replica.engine).pool
+    samples = [
+        ({"pool": name}, pool.checkedout())
+        for name, pool in pools.items()
+        if hasattr(pool, "checkedout")
+    ]
+    return [("db_pool_checked_out", "gauge", "Connections currently checked out", samples)]
+
+
+@registry.collector
+def hashing_metrics():
+    """Depth of the password hashing queue"""
+    return [
+        ("password_hash_pending", "gauge", "Hashing jobs running or queued", [({}, hashing_executor.pending)]),
+        ("password_hash_capacity", "gauge", "Jobs accepted before shedding load", [({}, hashing_executor.capacity)]),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,148 +1,225 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import List, Optional
-from app.schemas.todo import Todo, TodoCreate, TodoUpdate, TodoListResponse
-from app.core.dependencies import get_todo_service, get_current_user
-from app.services.todo_service import TodoService
-from app.models.user import User
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
+from app.schemas.todo import (
+    Todo, TodoCreate, TodoUpdate, TodoListResponse, TodoBatchRequest, TodoBatchResponse,
+    TodoImportResponse
+)
+from app.core.dependencies import (
+    conditional_todo_read, get_todo_service, get_todo_write_service, get_current_user, todo_fields, todo_sort
+)
+from app.services.todo_service import AsyncTodoService
+from app.core.principal_cache import Principal
+from app.utils.export import EXPORT_FORMATS
+from app.utils.serialization import render
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
 
 @router.post("/", response_model=Todo, status_code=status.HTTP_201_CREATED)
 async def create_todo(
+    response: Response,
     todo: TodoCreate,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new todo (requires authentication)"""
-    return todo_service.create_todo(todo, owner_id=current_user.id)
+    created_todo = await todo_service.create_todo(todo, owner_id=current_user.id)
+    return render(created_todo, response, status_code=status.HTTP_201_CREATED)
 
 
-@router.get("/", response_model=TodoListResponse)
+@router.post("/batch", response_model=TodoBatchResponse)
+async def batch_todos(
+    batch: TodoBatchRequest,
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Create, update, complete and delete many todos in one transaction (requires authentication)"""
+    return await todo_service.batch(batch, owner_id=current_user.id)
+
+
+@router.post("/import", response_model=TodoImportResponse)
+async def import_todos(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Body format: ndjson or csv (with a header row)"),
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Import todos from a streamed NDJSON or CSV body, in chunks (requires authentication)"""
+    return await todo_service.import_todos(owner_id=current_user.id, fmt=format, body=request.stream())
+
+
+@router.get("/", response_model=TodoListResponse, dependencies=[Depends(conditional_todo_read)])
 async def get_todos(
+    response: Response,
     is_done: Optional[bool] = Query(None, description="Filter by completion status"),
     q: Optional[str] = Query(None, description="Search by title or description"),
-    sort: Optional[str] = Query(None, description="Sort by: created_at or -created_at"),
+    sort: Optional[str] = Depends(todo_sort),
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page); replaces offset"),
+    include_total: bool = Query(True, description="Count matches exactly; false returns an estimated total"),
+    fields: Optional[Tuple[str, ...]] = Depends(todo_fields),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user's todos with filtering, searching, sorting and pagination (requires authentication)"""
-    return todo_service.get_todos(
+    page = await todo_service.get_todos(
         owner_id=current_user.id,
         is_done=is_done, 
         q=q, 
         sort=sort, 
         limit=limit, 
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields
     )
+    return render(page, response, sparse=fields is not None)
 
 
-@router.get("/overdue", response_model=TodoListResponse)
+@router.get("/overdue", response_model=TodoListResponse, dependencies=[Depends(conditional_todo_read)])
 async def get_overdue_todos(
+    response: Response,
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page); replaces offset"),
+    include_total: bool = Query(True, description="Count matches exactly; false returns an estimated total"),
+    fields: Optional[Tuple[str, ...]] = Depends(todo_fields),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get overdue todos (past due_date and not completed - requires authentication)"""
-    return todo_service.get_overdue(
+    page = await todo_service.get_overdue(
         owner_id=current_user.id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields
     )
+    return render(page, response, sparse=fields is not None)
 
 
-@router.get("/today", response_model=TodoListResponse)
+@router.get("/today", response_model=TodoListResponse, dependencies=[Depends(conditional_todo_read)])
 async def get_today_todos(
+    response: Response,
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page); replaces offset"),
+    include_total: bool = Query(True, description="Count matches exactly; false returns an estimated total"),
+    fields: Optional[Tuple[str, ...]] = Depends(todo_fields),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get today's todos (due_date is today and not completed - requires authentication)"""
-    return todo_service.get_today(
+    page = await todo_service.get_today(
         owner_id=current_user.id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields
+    )
+    return render(page, response, sparse=fields is not None)
+
+
+@router.get("/export")
+async def export_todos(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    is_done: Optional[bool] = Query(None, description="Filter by completion status"),
+    q: Optional[str] = Query(None, description="Search by title or description"),
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream all of the user's todos as NDJSON or CSV (requires authentication)"""
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        todo_service.export(owner_id=current_user.id, fmt=format, is_done=is_done, q=q),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="todos.{extension}"'},
     )
 
 
 @router.get("/{todo_id}", response_model=Todo)
 async def get_todo(
+    response: Response,
     todo_id: int,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[Tuple[str, ...]] = Depends(todo_fields),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get a specific todo (requires authentication)"""
-    todo = todo_service.get_todo(todo_id, owner_id=current_user.id)
+    todo = await todo_service.get_todo(todo_id, owner_id=current_user.id, fields=fields)
     if not todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return todo
+    return render(todo, response, sparse=fields is not None)
 
 
 @router.put("/{todo_id}", response_model=Todo)
 async def update_todo(
+    response: Response,
     todo_id: int,
     todo_update: TodoUpdate,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a todo (full update - requires authentication)"""
-    updated_todo = todo_service.update_todo(todo_id, owner_id=current_user.id, todo_update=todo_update)
+    updated_todo = await todo_service.update_todo(todo_id, owner_id=current_user.id, todo_update=todo_update)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return updated_todo
+    return render(updated_todo, response)
 
 
 @router.patch("/{todo_id}", response_model=Todo)
 async def partial_update_todo(
+    response: Response,
     todo_id: int,
     todo_update: TodoUpdate,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Partial update todo (only update provided fields - requires authentication)"""
-    updated_todo = todo_service.update_todo(todo_id, owner_id=current_user.id, todo_update=todo_update)
+    updated_todo = await todo_service.update_todo(todo_id, owner_id=current_user.id, todo_update=todo_update)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return updated_todo
+    return render(updated_todo, response)
 
 
 @router.post("/{todo_id}/complete", response_model=Todo)
 async def mark_todo_complete(
+    response: Response,
     todo_id: int,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Mark todo as complete (requires authentication)"""
-    completed_todo = todo_service.mark_complete(todo_id, owner_id=current_user.id)
+    completed_todo = await todo_service.mark_complete(todo_id, owner_id=current_user.id)
     if not completed_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return completed_todo
+    return render(completed_todo, response)
 
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_todo(
     todo_id: int,
-    todo_service: TodoService = Depends(get_todo_service),
-    current_user: User = Depends(get_current_user)
+    todo_service: AsyncTodoService = Depends(get_todo_write_service),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a todo (requires authentication)"""
-    success = todo_service.delete_todo(todo_id, owner_id=current_user.id)
+    success = await todo_service.delete_todo(todo_id, owner_id=current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
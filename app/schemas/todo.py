@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from typing import Optional, List, Tuple, Type
 from datetime import datetime
 
 
@@ -47,4 +48,92 @@ class TodoListResponse(BaseModel):
     items: List[Todo]
     total: int
     limit: int
-    offset: int
\ No newline at end of file
+    offset: int
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
+    estimated: bool = Field(False, description="True when total is an upper bound rather than an exact count")
+
+
+# Fields a sparse fieldset (?fields=) can ask for, in response order
+TODO_FIELDS = tuple(Todo.model_fields)
+
+# Orders a todo list (?sort=) can ask for: comma-separated keys, "-" for descending, ties
+# broken by id. Only combinations an index returns in order are listed (see ix_todos_owner_*);
+# due_date puts todos without one last.
+TODO_SORTS = (
+    "-created_at", "created_at",
+    "-updated_at", "updated_at",
+    "title", "-title",
+    "due_date",
+    "is_done,due_date,-created_at",
+    "is_done,created_at", "-is_done,-created_at",
+)
+DEFAULT_SORT = "-created_at"
+
+
+@lru_cache(maxsize=256)
+def sparse_todo_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Todo trimmed to a sparse fieldset (names from TODO_FIELDS)"""
+    return create_model(
+        "SparseTodo",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (Todo.model_fields[name].annotation, Todo.model_fields[name]) for name in fields},
+    )
+
+
+@lru_cache(maxsize=256)
+def sparse_list_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """TodoListResponse whose items are trimmed to a sparse fieldset"""
+    return create_model("SparseTodoListResponse", __base__=TodoListResponse,
+                        items=(List[sparse_todo_schema(fields)], ...))
+
+# Most operations of each kind accepted by one POST /todos/batch
+BATCH_MAX_ITEMS = 1000
+
+
+class TodoBatchUpdate(TodoUpdate):
+    id: int
+
+
+class TodoBatchRequest(BaseModel):
+    """Changes applied together, in one transaction: creates, then updates, completes and deletes"""
+    create: List[TodoCreate] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+    update: List[TodoBatchUpdate] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS,
+                                          description="Partial updates; only provided fields change")
+    complete: List[int] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS, description="Todo ids")
+    delete: List[int] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS, description="Todo ids")
+
+
+class TodoBatchItem(BaseModel):
+    id: int
+    status: str = Field(..., description="created, updated, completed, deleted or not_found")
+    todo: Optional[Todo] = None
+
+
+class TodoBatchResponse(BaseModel):
+    created: List[TodoBatchItem]
+    updated: List[TodoBatchItem]
+    completed: List[TodoBatchItem]
+    deleted: List[TodoBatchItem]
+
+
+class TodoImportError(BaseModel):
+    line: int = Field(..., description="Line number where the record starts")
+    error: str
+
+
+class TodoImportChunk(BaseModel):
+    chunk: int = Field(..., description="Chunk number, from 1")
+    first_line: int
+    last_line: int
+    imported: int = Field(..., description="Rows this chunk committed")
+    failed: int
+    error: Optional[str] = Field(None, description="Why the chunk's insert failed: none of its rows were committed")
+
+
+class TodoImportResponse(BaseModel):
+    imported: int
+    failed: int
+    chunks: int = Field(..., description="Chunks committed; each is inserted in its own transaction")
+    completed: bool = Field(True, description="False when a chunk's insert failed: the rest of the body was not read")
+    progress: List[TodoImportChunk] = Field(default_factory=list, description="Outcome of each chunk, in order")
+    errors: List[TodoImportError] = Field(default_factory=list, description="First failures (capped)")
@@ -1,8 +1,20 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from app.schemas.todo import TodoCreate, TodoUpdate, Todo, TodoListResponse
-from app.repositories.todo_repo import TodoRepository
+from app.core.config import settings
+from app.core.data_version import DataVersion, data_versions
+from app.core.database import run_in_session, stream_in_session
+from app.core.replicas import replica_router
+from app.schemas.todo import (
+    TodoCreate, TodoUpdate, Todo, TodoListResponse, TodoBatchRequest, TodoBatchItem, TodoBatchResponse,
+    TodoImportChunk, TodoImportError, TodoImportResponse
+)
+from app.repositories.todo_repo import TodoPage, TodoRepository
+from app.utils.export import export_chunk, export_header
+from app.utils.importer import IMPORT_PARSERS, InvalidRecord
 from app.utils.pagination import paginate_list
+from app.utils.serialization import to_list_response, to_todo
 
 
 class TodoService:
@@ -11,10 +23,23 @@ class TodoService:
     def __init__(self, db: Session):
         self.repo = TodoRepository(db)
     
+    def _to_list_response(self, page: TodoPage, limit: int, offset: int,
+                          fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
+        """Convert a repository page into the list response (trimmed to a sparse fieldset when given)"""
+        return to_list_response(
+            fields,
+            items=[to_todo(todo, fields) for todo in page.items],
+            total=page.total,
+            limit=limit,
+            offset=offset,
+            next_cursor=page.next_cursor,
+            estimated=page.estimated
+        )
+    
     def create_todo(self, todo: TodoCreate, owner_id: int) -> Todo:
         """Create a new todo for the current user"""
         created_todo = self.repo.create(todo, owner_id=owner_id)
-        return Todo.from_orm(created_todo)
+        return to_todo(created_todo)
     
     def get_todos(self, 
                  owner_id: int,
@@ -22,30 +47,27 @@ class TodoService:
                  q: Optional[str] = None, 
                  sort: Optional[str] = None,
                  limit: int = 10, 
-                 offset: int = 0) -> TodoListResponse:
+                 offset: int = 0,
+                 cursor: Optional[str] = None,
+                 include_total: bool = True,
+                 fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
         """Get todos for the current user with filtering, searching, sorting and pagination"""
-        todos, total = self.repo.get_all(owner_id=owner_id, is_done=is_done, q=q, sort=sort, limit=limit, offset=offset)
-        todo_objects = [Todo.from_orm(todo) for todo in todos]
-        
-        return TodoListResponse(
-            items=todo_objects,
-            total=total,
-            limit=limit,
-            offset=offset
-        )
+        page = self.repo.get_all(owner_id=owner_id, is_done=is_done, q=q, sort=sort, limit=limit,
+                                 offset=offset, cursor=cursor, include_total=include_total, fields=fields)
+        return self._to_list_response(page, limit, offset, fields)
     
-    def get_todo(self, todo_id: int, owner_id: int) -> Optional[Todo]:
+    def get_todo(self, todo_id: int, owner_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Todo]:
         """Get todo by ID - verify ownership"""
-        todo = self.repo.get_by_id(todo_id, owner_id=owner_id)
+        todo = self.repo.get_by_id(todo_id, owner_id=owner_id, fields=fields)
         if todo:
-            return Todo.from_orm(todo)
+            return to_todo(todo, fields)
         return None
     
     def update_todo(self, todo_id: int, owner_id: int, todo_update: TodoUpdate) -> Optional[Todo]:
         """Update todo - verify ownership"""
         updated_todo = self.repo.update(todo_id, todo_update, owner_id=owner_id)
         if updated_todo:
-            return Todo.from_orm(updated_todo)
+            return to_todo(updated_todo)
         return None
     
     def delete_todo(self, todo_id: int, owner_id: int) -> bool:
@@ -56,29 +78,207 @@ class TodoService:
         """Mark todo as complete - verify ownership"""
         completed_todo = self.repo.mark_complete(todo_id, owner_id=owner_id)
         if completed_todo:
-            return Todo.from_orm(completed_todo)
+            return to_todo(completed_todo)
         return None
     
-    def get_overdue(self, owner_id: int, limit: int = 10, offset: int = 0) -> TodoListResponse:
-        """Get overdue todos for the current user"""
-        todos, total = self.repo.get_overdue(owner_id=owner_id, limit=limit, offset=offset)
-        todo_objects = [Todo.from_orm(todo) for todo in todos]
+    def batch(self, request: TodoBatchRequest, owner_id: int) -> TodoBatchResponse:
+        """Apply a batch of changes in one transaction and report the outcome per item"""
+        result = self.repo.batch(owner_id, creates=request.create, updates=request.update,
+                                 completes=request.complete, deletes=request.delete)
         
-        return TodoListResponse(
-            items=todo_objects,
-            total=total,
-            limit=limit,
-            offset=offset
+        def item(todo_id: int, status: str) -> TodoBatchItem:
+            if todo_id not in result.found:
+                return TodoBatchItem(id=todo_id, status="not_found")
+            todo = result.todos.get(todo_id)
+            return TodoBatchItem(id=todo_id, status=status, todo=to_todo(todo) if todo else None)
+        
+        return TodoBatchResponse(
+            created=[TodoBatchItem(id=todo.id, status="created", todo=to_todo(todo)) for todo in result.created],
+            updated=[item(u.id, "updated") for u in request.update],
+            completed=[item(todo_id, "completed") for todo_id in request.complete],
+            deleted=[item(todo_id, "deleted") for todo_id in request.delete],
         )
     
-    def get_today(self, owner_id: int, limit: int = 10, offset: int = 0) -> TodoListResponse:
+    def import_chunk(self, records: List[Tuple[int, object]], owner_id: int,
+                     chunk: int) -> Tuple[TodoImportChunk, List[TodoImportError]]:
+        """Validate parsed (line, record) pairs and insert the valid ones in one transaction.
+        A database error rolls the chunk back and is reported on it rather than raised"""
+        todos = []
+        errors = []
+        for line, record in records:
+            if isinstance(record, InvalidRecord):
+                errors.append(TodoImportError(line=line, error=str(record)))
+                continue
+            try:
+                todos.append(TodoCreate.model_validate(record))
+            except ValidationError as exc:
+                message = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+                errors.append(TodoImportError(line=line, error=message))
+        outcome = TodoImportChunk(chunk=chunk, first_line=records[0][0], last_line=records[-1][0],
+                                  imported=0, failed=len(errors))
+        try:
+            outcome.imported = self.repo.create_many(todos, owner_id=owner_id) if todos else 0
+        except DBAPIError as exc:
+            self.repo.db.rollback()
+            outcome.failed += len(todos)
+            outcome.error = f"Database error, chunk not saved: {type(exc.orig).__name__}"
+        return outcome, errors
+    
+    def get_data_version(self, owner_id: int) -> DataVersion:
+        """What the user's todo reads currently depend on (for ETags)"""
+        return self.repo.data_version(owner_id)
+    
+    def get_overdue(self, owner_id: int, limit: int = 10, offset: int = 0,
+                    cursor: Optional[str] = None, include_total: bool = True,
+                    fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
+        """Get overdue todos for the current user"""
+        page = self.repo.get_overdue(owner_id=owner_id, limit=limit, offset=offset, cursor=cursor,
+                                   include_total=include_total, fields=fields)
+        return self._to_list_response(page, limit, offset, fields)
+    
+    def get_today(self, owner_id: int, limit: int = 10, offset: int = 0,
+                    cursor: Optional[str] = None, include_total: bool = True,
+                    fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
         """Get today's todos for the current user"""
-        todos, total = self.repo.get_today(owner_id=owner_id, limit=limit, offset=offset)
-        todo_objects = [Todo.from_orm(todo) for todo in todos]
+        page = self.repo.get_today(owner_id=owner_id, limit=limit, offset=offset, cursor=cursor,
+                                   include_total=include_total, fields=fields)
+        return self._to_list_response(page, limit, offset, fields)
+
+
+class AsyncTodoService:
+    """Async variant of TodoService.
+
+    Each call runs the matching TodoService method inside the session's sync
+    context: AsyncSession.run_sync, or the threadpool for a plain Session. With
+    the threadpool the queries and the schema conversion inside the method run
+    off the event loop; with run_sync only the database I/O is awaited, and the
+    Python work runs on the event loop's thread. Either way the route's response
+    validation and JSON serialization run on the event loop afterwards.
+    """
+    
+    def __init__(self, db, read_db=None):
+        self.db = db
+        self.read_db = read_db if read_db is not None else db
+    
+    async def _run(self, method: str, *args, **kwargs):
+        return await run_in_session(
+            self.db, lambda session: getattr(TodoService(session), method)(*args, **kwargs)
+        )
+    
+    async def _run_read(self, method: str, *args, **kwargs):
+        """Like _run, on the read session (a replica when one is in use)"""
+        return await run_in_session(
+            self.read_db, lambda session: getattr(TodoService(session), method)(*args, **kwargs)
+        )
+    
+    async def create_todo(self, todo: TodoCreate, owner_id: int) -> Todo:
+        """Create a new todo for the current user"""
+        return await self._run("create_todo", todo, owner_id=owner_id)
+    
+    async def get_todos(self, 
+                        owner_id: int,
+                        is_done: Optional[bool] = None, 
+                        q: Optional[str] = None, 
+                        sort: Optional[str] = None,
+                        limit: int = 10, 
+                        offset: int = 0,
+                        cursor: Optional[str] = None,
+                        include_total: bool = True,
+                        fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
+        """Get todos for the current user with filtering, searching, sorting and pagination"""
+        return await self._run_read("get_todos", owner_id=owner_id, is_done=is_done, q=q, sort=sort,
+                               limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+                               fields=fields)
+    
+    async def get_todo(self, todo_id: int, owner_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Todo]:
+        """Get todo by ID - verify ownership"""
+        return await self._run_read("get_todo", todo_id, owner_id=owner_id, fields=fields)
+    
+    async def update_todo(self, todo_id: int, owner_id: int, todo_update: TodoUpdate) -> Optional[Todo]:
+        """Update todo - verify ownership"""
+        return await self._run("update_todo", todo_id, owner_id=owner_id, todo_update=todo_update)
+    
+    async def delete_todo(self, todo_id: int, owner_id: int) -> bool:
+        """Delete todo - verify ownership"""
+        return await self._run("delete_todo", todo_id, owner_id=owner_id)
+    
+    async def mark_complete(self, todo_id: int, owner_id: int) -> Optional[Todo]:
+        """Mark todo as complete - verify ownership"""
+        return await self._run("mark_complete", todo_id, owner_id=owner_id)
+    
+    async def batch(self, request: TodoBatchRequest, owner_id: int) -> TodoBatchResponse:
+        """Apply a batch of changes in one transaction and report the outcome per item"""
+        return await self._run("batch", request, owner_id=owner_id)
+    
+    async def export(self, owner_id: int, fmt: str, is_done: Optional[bool] = None,
+                     q: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the user's todos as NDJSON or CSV text, one chunk of rows at a time.
+
+        Runs on its own read session: the body is sent after the request's sessions are closed.
+        """
+        yield export_header(fmt)
+        async with replica_router.open_session(owner_id) as db:
+            statement = TodoRepository(db).export_statement(owner_id=owner_id, is_done=is_done, q=q)
+            async for rows in stream_in_session(db, statement, settings.export_chunk_size):
+                ids = [row.id for row in rows]
+                tags = await run_in_session(db, lambda session: TodoRepository(session).tags.names_by_todo(ids))
+                yield export_chunk(fmt, rows, tags)
+    
+    async def import_todos(self, owner_id: int, fmt: str, body: AsyncIterator[bytes]) -> TodoImportResponse:
+        """Parse a streamed NDJSON or CSV body and insert it chunk by chunk.
+
+        Only one chunk of records is held at a time; each chunk is validated and
+        committed off the event loop, and its outcome is added to progress. A chunk
+        whose insert fails stops the import: earlier chunks stay committed, and the
+        response says which chunk (and lines) failed. Errors beyond import_max_errors
+        are counted, not kept.
+        """
+        result = TodoImportResponse(imported=0, failed=0, chunks=0)
         
-        return TodoListResponse(
-            items=todo_objects,
-            total=total,
-            limit=limit,
-            offset=offset
-        )
\ No newline at end of file
+        async def flush(records) -> bool:
+            outcome, errors = await self._run("import_chunk", records, owner_id=owner_id,
+                                              chunk=len(result.progress) + 1)
+            result.progress.append(outcome)
+            result.imported += outcome.imported
+            result.failed += outcome.failed
+            result.errors.extend(errors[:settings.import_max_errors - len(result.errors)])
+            if outcome.error is not None:
+                result.completed = False
+                return False
+            result.chunks += 1
+            return True
+        
+        records = []
+        async for line, record in IMPORT_PARSERS[fmt](body):
+            records.append((line, record))
+            if len(records) >= settings.import_chunk_size:
+                if not await flush(records):
+                    return result
+                records = []
+        if records:
+            await flush(records)
+        return result
+    
+    async def get_data_version(self, owner_id: int) -> DataVersion:
+        """What the user's todo reads currently depend on, from the in-process cache when fresh"""
+        data_version = data_versions.get(owner_id)
+        if data_version is None:
+            # Not cached when a write commits during the read: it may have read the old version
+            with data_versions.reading(owner_id) as store:
+                data_version = await self._run_read("get_data_version", owner_id)
+                store(data_version)
+        return data_version
+    
+    async def get_overdue(self, owner_id: int, limit: int = 10, offset: int = 0,
+                          cursor: Optional[str] = None, include_total: bool = True,
+                          fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
+        """Get overdue todos for the current user"""
+        return await self._run_read("get_overdue", owner_id=owner_id, limit=limit, offset=offset, cursor=cursor,
+                               include_total=include_total, fields=fields)
+    
+    async def get_today(self, owner_id: int, limit: int = 10, offset: int = 0,
+                          cursor: Optional[str] = None, include_total: bool = True,
+                          fields: Optional[Tuple[str, ...]] = None) -> TodoListResponse:
+        """Get today's todos for the current user"""
+        return await self._run_read("get_today", owner_id=owner_id, limit=limit, offset=offset, cursor=cursor,
+                               include_total=include_total, fields=fields)
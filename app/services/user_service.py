@@ -2,7 +2,11 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema
-from app.core.security import get_password_hash, verify_password
+from app.core.database import run_in_session
+from app.core.principal_cache import principal_cache
+from app.core.security import (
+    get_password_hash, verify_password, get_password_hash_async, verify_password_async
+)
 
 
 class UserService:
@@ -22,8 +26,12 @@ class UserService:
     def create_user(self, user_create: UserCreate) -> User:
         """Create new user with hashed password"""
         hashed_password = get_password_hash(user_create.password)
+        return self.create_user_with_hash(user_create.email, hashed_password)
+    
+    def create_user_with_hash(self, email: str, hashed_password: str) -> User:
+        """Create new user from an already hashed password"""
         db_user = User(
-            email=user_create.email,
+            email=email,
             hashed_password=hashed_password,
             is_active=True
         )
@@ -32,6 +40,17 @@ class UserService:
         self.db.refresh(db_user)
         return db_user
     
+    def deactivate_user(self, user_id: int) -> Optional[User]:
+        """Deactivate user and drop their cached tokens"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        db_user.is_active = False
+        self.db.commit()
+        self.db.refresh(db_user)
+        principal_cache.invalidate_user(user_id)
+        return db_user
+    
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password"""
         user = self.get_user_by_email(email)
@@ -39,4 +58,40 @@ class UserService:
             return None
         if not verify_password(password, user.hashed_password):
             return None
-        return user
\ No newline at end of file
+        return user
+
+
+class AsyncUserService:
+    """Async variant of UserService (runs it inside the session's sync context)"""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    async def _run(self, method: str, *args):
+        return await run_in_session(self.db, lambda session: getattr(UserService(session), method)(*args))
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self._run("get_user_by_email", email)
+    
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self._run("get_user_by_id", user_id)
+    
+    async def create_user(self, user_create: UserCreate) -> User:
+        """Create new user with hashed password (hashing runs in the hashing pool)"""
+        hashed_password = await get_password_hash_async(user_create.password)
+        return await self._run("create_user_with_hash", user_create.email, hashed_password)
+    
+    async def deactivate_user(self, user_id: int) -> Optional[User]:
+        """Deactivate user and drop their cached tokens"""
+        return await self._run("deactivate_user", user_id)
+    
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
+        """Authenticate user by email and password (bcrypt runs in the hashing pool)"""
+        user = await self.get_user_by_email(email)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+        return user
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+# Output columns, in order; tags are appended from a per-chunk lookup
+EXPORT_FIELDS = ["id", "title", "description", "is_done", "due_date", "created_at", "updated_at", "tags"]
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_header(fmt: str) -> str:
+    """Text written before the first row"""
+    if fmt == "csv":
+        return ",".join(EXPORT_FIELDS) + "\r\n"
+    return ""
+
+
+def export_chunk(fmt: str, rows: Sequence, tags: Dict[int, List[str]]) -> str:
+    """Serialize one chunk of (id, title, ..., updated_at) rows"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([*(_isoformat(value) for value in row), ",".join(tags.get(row.id, []))])
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, [*(_isoformat(value) for value in row), tags.get(row.id, [])]))) + "\n"
+        for row in rows
+    )
@@ -0,0 +1,193 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterator, List, Tuple
+
+from app.core.config import settings
+
+# Fields read from a CSV row (other columns, such as an export's id or timestamps, are ignored)
+IMPORT_FIELDS = ("title", "description", "is_done", "due_date", "tags")
+
+
+class InvalidRecord(ValueError):
+    """A line of the import body that could not be parsed"""
+
+
+async def iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Split a streamed UTF-8 body into (line number, line) as it arrives, keeping line endings.
+
+    A line longer than import_max_record_size is not buffered: it comes out as an
+    InvalidRecord instead, and reading resumes on the next line.
+    """
+    max_size = settings.import_max_record_size
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    too_long = InvalidRecord(f"Line longer than {max_size} characters")
+    pending = ""
+    overflow = False  # the line in progress already went past max_size and was dropped
+    line_no = 0
+    async for chunk in body:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            if overflow or len(line) > max_size:
+                overflow = False
+                yield line_no, too_long
+            else:
+                yield line_no, line + "\n"
+        if len(pending) > max_size:
+            pending, overflow = "", True
+    pending += decoder.decode(b"", final=True)
+    if overflow or len(pending) > max_size:
+        yield line_no + 1, too_long
+    elif pending:
+        yield line_no + 1, pending
+
+
+async def iter_ndjson(body: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line number, dict or InvalidRecord) for each non-blank NDJSON line"""
+    async for line_no, line in iter_lines(body):
+        if isinstance(line, InvalidRecord):
+            yield line_no, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, InvalidRecord(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, InvalidRecord("Expected a JSON object")
+            continue
+        yield line_no, record
+
+
+class _EndOfLines(Exception):
+    """The buffered lines ran out, possibly in the middle of a CSV record"""
+
+
+class _LineFeed:
+    """Lines buffered for csv.reader, which pulls them one at a time as it parses.
+
+    Running out raises _EndOfLines rather than StopIteration, so a record cut off by
+    the end of what has arrived so far is parsed again once more lines are buffered.
+    """
+
+    def __init__(self):
+        self.lines: List[Tuple[int, object]] = []
+        self.pos = 0
+        self.size = 0
+        self.wanted = 1  # lines to buffer before parsing again; doubles while a record stays open
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self.pos == len(self.lines):
+            raise _EndOfLines
+        line = self.lines[self.pos][1]
+        self.pos += 1
+        if isinstance(line, InvalidRecord):
+            raise line
+        return line
+
+    def push(self, line_no: int, line) -> None:
+        self.lines.append((line_no, line))
+        self.size += len(line) if isinstance(line, str) else 0
+
+    def ready(self, max_size: int) -> bool:
+        return len(self.lines) >= self.wanted or self.size > max_size
+
+    def size_between(self, start: int, end: int) -> int:
+        return sum(len(line) for _, line in self.lines[start:end] if isinstance(line, str))
+
+    def keep_from(self, start: int) -> None:
+        """Drop the parsed lines before start and rewind to it"""
+        del self.lines[:start]
+        self.pos = 0
+        self.size = self.size_between(0, len(self.lines))
+        self.wanted = 2 * len(self.lines) or 1
+
+
+def _read_rows(feed: _LineFeed, final: bool, max_size: int) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, values or InvalidRecord) for each complete CSV record in feed.
+
+    A record still open when the lines run out stays buffered for the next call. At the
+    end of the body, or once it outgrows max_size, it fails instead, and parsing resumes
+    on the line after its first: a stray quote costs one row, not the rest of the body.
+    """
+    reader = csv.reader(feed)
+    while True:
+        start = feed.pos
+        try:
+            values = next(reader)
+        except _EndOfLines:
+            if start == len(feed.lines) or (not final and feed.size_between(start, None) <= max_size):
+                feed.keep_from(start)
+                return
+            error = InvalidRecord("Unterminated quoted field" if final else
+                                  f"Record longer than {max_size} characters")
+            feed.pos = start + 1
+        except InvalidRecord as exc:
+            error = exc
+        except csv.Error as exc:
+            error = InvalidRecord(f"Invalid CSV: {exc}")
+        else:
+            if feed.size_between(start, feed.pos) <= max_size:
+                yield feed.lines[start][0], values
+                continue
+            error = InvalidRecord(f"Record longer than {max_size} characters")
+        yield feed.lines[start][0], error
+
+
+def _csv_record(header, values: List[str]) -> dict:
+    if len(values) != len(header):
+        raise InvalidRecord(f"Expected {len(header)} columns, got {len(values)}")
+    row = dict(zip(header, values))
+    record = {field: row[field] or None for field in IMPORT_FIELDS if field in row}
+    if record.get("tags"):
+        record["tags"] = [name.strip() for name in record["tags"].split(",") if name.strip()]
+    if record.get("is_done") is None:
+        record.pop("is_done", None)
+    return record
+
+
+async def iter_csv(body: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line number, dict or InvalidRecord) for each CSV record after the header row.
+
+    Lines are fed to csv.reader as they arrive, so quoted fields may contain newlines
+    and quotes inside unquoted fields are literal, as in any CSV reader.
+    """
+    max_size = settings.import_max_record_size
+    feed = _LineFeed()
+    header = None
+
+    def records(final: bool) -> Iterator[Tuple[int, object]]:
+        nonlocal header
+        for start, values in _read_rows(feed, final, max_size):
+            if isinstance(values, InvalidRecord):
+                yield start, values
+            elif not any(value.strip() for value in values):
+                continue
+            elif header is None:
+                header = [name.strip() for name in values]
+            else:
+                try:
+                    yield start, _csv_record(header, values)
+                except InvalidRecord as exc:
+                    yield start, exc
+
+    async for line_no, line in iter_lines(body):
+        feed.push(line_no, line)
+        if feed.ready(max_size):
+            for item in records(final=False):
+                yield item
+    for item in records(final=True):
+        yield item
+
+
+IMPORT_PARSERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
@@ -1,5 +1,9 @@
-from typing import List, Generic, TypeVar
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Generic, Sequence, Tuple, TypeVar
 from pydantic import BaseModel
+from sqlalchemy import and_, literal, or_, tuple_
 
 T = TypeVar('T')
 
@@ -30,4 +34,83 @@ def paginate_list(items: List[T], limit: int = 10, offset: int = 0) -> Paginated
         total=total,
         limit=params.limit,
         offset=params.offset
-    )
\ No newline at end of file
+    )
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor is malformed or belongs to another ordering"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(key: str, values: Sequence[Any]) -> str:
+    """Encode the sort values of the last row of a page as an opaque cursor"""
+    payload = {"k": key, "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, key: str) -> List[Any]:
+    """Decode a cursor made by encode_cursor for the same ordering key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["k"] != key:
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        return [_decode_value(value) for value in payload["v"]]
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _valid_value(column: Any, value: Any) -> bool:
+    """Whether a decoded cursor value fits its ordering column: the column's Python type
+    (bool is not an int here), or None where the column is nullable"""
+    if value is None:
+        return bool(getattr(column, "nullable", False))
+    python_type = column.type.python_type
+    if isinstance(value, bool) and python_type is not bool:
+        return False
+    return isinstance(value, python_type)
+
+
+def keyset_condition(order_by: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """Build the WHERE clause that seeks past `values` in the given ordering.
+
+    order_by is a list of (column, descending) pairs; each value must match its
+    column's type (InvalidCursor otherwise). When every key sorts the
+    same way a row-value comparison is used, which the database can serve as a
+    single index range; mixed directions fall back to the OR expansion.
+
+    A NULL value can only follow an earlier `column IS NULL` key, so the rows tied with
+    it on the earlier keys are NULL there too: that key is left out of the comparison.
+    """
+    if len(values) != len(order_by):
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    # Cursors come from clients: a tampered value must not reach the column's bind processor
+    if not all(_valid_value(column, value) for (column, _), value in zip(order_by, values)):
+        raise InvalidCursor("Invalid cursor")
+    order_by = [key for key, value in zip(order_by, values) if value is not None]
+    values = [value for value in values if value is not None]
+    bounds = [literal(value, column.type) for (column, _), value in zip(order_by, values)]
+    directions = {descending for _, descending in order_by}
+    if len(directions) == 1:
+        columns = tuple_(*[column for column, _ in order_by])
+        return columns < tuple_(*bounds) if directions.pop() else columns > tuple_(*bounds)
+    
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        equal_prefix = [order_by[j][0] == bounds[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column < bounds[i] if descending else column > bounds[i]))
+    return or_(*clauses)
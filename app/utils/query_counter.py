@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Records the SQL statements an engine executes while active"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Count statements run on engine (sync or async) inside the block.
+
+    An executemany counts once, since it is a single round trip per batch.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter._record)
+
+
+@contextmanager
+def assert_query_count(engine, expected: int):
+    """Fail if the block runs more than expected statements (for tests and benchmarks)"""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > expected:
+        listing = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(f"Expected at most {expected} statements, got {counter.count}:\n{listing}")
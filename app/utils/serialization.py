@@ -0,0 +1,70 @@
+from typing import Any, Optional, Tuple, Union
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from app.core.config import settings
+from app.schemas.todo import Todo, TodoListResponse, sparse_list_schema, sparse_todo_schema
+
+
+def todo_dict(todo, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """Todo response fields of a todo row as a plain dict, in schema order, without validation.
+
+    fields narrows it to a sparse fieldset.
+    """
+    if fields is not None:
+        return {
+            name: [{"id": tag.id, "name": tag.name} for tag in todo.tags] if name == "tags" else getattr(todo, name)
+            for name in fields
+        }
+    return {
+        "title": todo.title,
+        "description": todo.description,
+        "is_done": todo.is_done,
+        "due_date": todo.due_date,
+        "id": todo.id,
+        "created_at": todo.created_at,
+        "updated_at": todo.updated_at,
+        "tags": [{"id": tag.id, "name": tag.name} for tag in todo.tags],
+    }
+
+
+def to_todo(todo, fields: Optional[Tuple[str, ...]] = None) -> Union[BaseModel, dict]:
+    """Todo for a todo row: a trusted dict when fast_serialization is on, a validated schema otherwise.
+
+    fields narrows it to a sparse fieldset (validated against the trimmed schema).
+    """
+    if settings.fast_serialization:
+        return todo_dict(todo, fields)
+    if fields is not None:
+        return sparse_todo_schema(fields).model_validate(todo)
+    return Todo.from_orm(todo)
+
+
+def to_list_response(fields: Optional[Tuple[str, ...]] = None, **content: Any) -> Union[BaseModel, dict]:
+    """TodoListResponse over already-built items: a plain dict when fast_serialization is on.
+
+    Items built for a sparse fieldset (fields) need the matching trimmed list schema.
+    """
+    if settings.fast_serialization:
+        return content
+    if fields is not None:
+        return sparse_list_schema(fields)(**content)
+    return TodoListResponse(**content)
+
+
+def render(content: Union[BaseModel, dict], response: Response, status_code: int = 200, sparse: bool = False):
+    """Return value for a route: pre-serialized JSON bytes when fast_serialization is on.
+
+    Otherwise the content is returned for FastAPI to validate against response_model.
+    Sparse fieldsets (sparse=True) do not match response_model, so they are always
+    sent pre-serialized. Headers already set on the route's Response (e.g. ETag) are carried over.
+    """
+    if not settings.fast_serialization and not sparse:
+        return content
+    body = content.model_dump_json() if isinstance(content, BaseModel) else to_json(content)
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=dict(response.headers),
+        media_type="application/json",
+    )
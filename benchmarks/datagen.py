@@ -0,0 +1,175 @@
+"""Deterministic synthetic dataset for benchmarks and load tests.
+
+Bulk-loads users, todos, tags and todo_tag links straight through the table
+metadata (executemany INSERTs, no ORM objects), then seeds todo_counters.
+The same seed and spec always produce the same rows (dates are relative to load time):
+
+    python -m benchmarks.datagen --url sqlite:///bench.db --users 1000 --todos 50 --distribution zipf
+
+Every user's password is BENCH_PASSWORD, and their email is user{n}@bench.example.
+"""
+import argparse
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import case, func, literal, select
+
+BENCH_PASSWORD = "benchpass123"
+
+# Words titles and descriptions are drawn from, so searches have something to match
+WORDS = (
+    "invoice", "report", "groceries", "call", "email", "review", "deploy", "meeting", "budget", "design",
+    "refactor", "dentist", "laundry", "taxes", "plan", "draft", "book", "flight", "renew", "insurance",
+    "garden", "backup", "update", "schedule", "client", "release", "notes", "order", "pay", "clean",
+)
+
+DISTRIBUTIONS = ("fixed", "uniform", "zipf")
+
+# Rows per executemany
+CHUNK_SIZE = 5000
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 100
+    todos_per_user: int = 50  # mean
+    distribution: str = "uniform"  # fixed: exactly the mean; uniform: 0..2x mean; zipf: few heavy users
+    tags: int = 50  # distinct tag names
+    max_tags_per_todo: int = 3
+    due_ratio: float = 0.6  # share of todos with a due date
+    due_window_days: int = 30  # due dates fall within +-window of now
+    done_ratio: float = 0.3
+    seed: int = 42
+
+
+def user_email(n: int) -> str:
+    return f"user{n}@bench.example"
+
+
+def todo_counts(spec: DatasetSpec, rng: random.Random) -> List[int]:
+    """Number of todos of each user, drawn from spec.distribution around spec.todos_per_user"""
+    if spec.distribution == "fixed":
+        return [spec.todos_per_user] * spec.users
+    if spec.distribution == "uniform":
+        return [rng.randint(0, 2 * spec.todos_per_user) for _ in range(spec.users)]
+    if spec.distribution == "zipf":
+        # Weight 1/rank, scaled so the total matches users * mean; ranks are shuffled across users
+        weights = [1 / rank for rank in range(1, spec.users + 1)]
+        scale = spec.users * spec.todos_per_user / sum(weights)
+        counts = [max(0, round(weight * scale)) for weight in weights]
+        rng.shuffle(counts)
+        return counts
+    raise ValueError(f"Unknown distribution: {spec.distribution}")
+
+
+def generate(engine, spec: DatasetSpec, hashed_password: str) -> Dict[int, Tuple[int, int]]:
+    """Load the dataset into an empty schema on engine.
+
+    Returns user id -> (first todo id, todo count); each user's todo ids are contiguous.
+    """
+    from app.models import Base
+
+    tables = Base.metadata.tables
+    users, todos, tags, links, counters = (
+        tables["users"], tables["todos"], tables["tags"], tables["todo_tag"], tables["todo_counters"],
+    )
+    rng = random.Random(spec.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    tag_names = [f"{WORDS[i % len(WORDS)]}-{i}" for i in range(spec.tags)]
+    todo_ranges = {}
+
+    with engine.begin() as conn:
+        conn.execute(users.insert(), [
+            {"id": n, "email": user_email(n), "hashed_password": hashed_password,
+             "is_active": True, "created_at": now, "updated_at": now}
+            for n in range(1, spec.users + 1)
+        ])
+        if tag_names:
+            conn.execute(tags.insert(), [{"id": i + 1, "name": name} for i, name in enumerate(tag_names)])
+
+        todo_rows, link_rows = [], []
+        todo_id = 0
+
+        def flush():
+            if todo_rows:
+                conn.execute(todos.insert(), todo_rows)
+            if link_rows:
+                conn.execute(links.insert(), link_rows)
+            todo_rows.clear()
+            link_rows.clear()
+
+        for owner_id, count in enumerate(todo_counts(spec, rng), start=1):
+            todo_ranges[owner_id] = (todo_id + 1, count)
+            for _ in range(count):
+                todo_id += 1
+                words = rng.sample(WORDS, 3)
+                due_date = None
+                if rng.random() < spec.due_ratio:
+                    due_date = now + timedelta(minutes=rng.randint(-spec.due_window_days, spec.due_window_days) * 1440
+                                               + rng.randint(0, 1439))
+                created_at = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+                todo_rows.append({
+                    "id": todo_id, "title": " ".join(words).capitalize(),
+                    "description": f"Remember to {words[0]} the {words[1]} before the {words[2]}",
+                    "is_done": rng.random() < spec.done_ratio, "due_date": due_date, "owner_id": owner_id,
+                    "created_at": created_at, "updated_at": created_at,
+                })
+                for tag_index in rng.sample(range(len(tag_names)), rng.randint(0, min(spec.max_tags_per_todo, len(tag_names)))):
+                    link_rows.append({"todo_id": todo_id, "tag_id": tag_index + 1})
+                if len(todo_rows) >= CHUNK_SIZE:
+                    flush()
+        flush()
+
+        # Counters as TodoCounterRepository would have kept them
+        conn.execute(counters.insert().from_select(
+            ["owner_id", "total", "done", "version", "modified_at"],
+            _counter_select(todos),
+        ))
+    return todo_ranges
+
+
+def _counter_select(todos):
+    return select(
+        todos.c.owner_id,
+        func.count(todos.c.id),
+        func.sum(case((todos.c.is_done == True, 1), else_=0)),
+        literal(0),
+        func.max(todos.c.updated_at),
+    ).group_by(todos.c.owner_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="database URL; the schema is created if missing")
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--todos", type=int, default=DatasetSpec.todos_per_user, help="mean todos per user")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=DatasetSpec.distribution)
+    parser.add_argument("--tags", type=int, default=DatasetSpec.tags)
+    parser.add_argument("--max-tags", type=int, default=DatasetSpec.max_tags_per_todo, help="per todo")
+    parser.add_argument("--due-ratio", type=float, default=DatasetSpec.due_ratio)
+    parser.add_argument("--done-ratio", type=float, default=DatasetSpec.done_ratio)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args()
+
+    from app.core.database import create_db_engine
+    from app.core.search import install_fts
+    from app.core.security import get_password_hash
+    from app.models import Base
+
+    spec = DatasetSpec(users=args.users, todos_per_user=args.todos, distribution=args.distribution,
+                       tags=args.tags, max_tags_per_todo=args.max_tags, due_ratio=args.due_ratio,
+                       done_ratio=args.done_ratio, seed=args.seed)
+    engine = create_db_engine(args.url)
+    Base.metadata.create_all(engine)
+    install_fts(engine)
+    started = time.perf_counter()
+    ranges = generate(engine, spec, get_password_hash(BENCH_PASSWORD))
+    total = sum(count for _, count in ranges.values())
+    print(f"{asdict(spec)}")
+    print(f"  {spec.users} users, {total} todos in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Concurrent read/write throughput of SQLite under each connection mode.
+
+Reader threads page GET /todos/-style queries and writer threads create
+todos through TodoRepository, against a scratch SQLite file, for a fixed
+time per mode, each in its own process:
+
+    static       one shared connection, default PRAGMAs (the old setup)
+    queue        pooled connections, default PRAGMAs (rollback journal)
+    queue+wal    pooled connections with the PRAGMAs from settings (WAL, ...)
+
+    python -m benchmarks.db_modes --readers 8 --writers 2 --duration 5
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+PRAGMA_SETTINGS = ("sqlite_journal_mode", "sqlite_synchronous", "sqlite_mmap_size",
+                   "sqlite_cache_size", "sqlite_busy_timeout", "sqlite_temp_store")
+
+MODES = {
+    "static": ("static", False),
+    "queue": ("queue", False),
+    "queue+wal": ("queue", True),
+}
+
+
+def run_mode(name: str, readers: int, writers: int, duration: float, seed_todos: int):
+    from sqlalchemy.orm import sessionmaker
+    from app.core.config import settings
+    from app.core.database import create_db_engine
+    from app.models import Base
+    from app.repositories.todo_repo import TodoRepository
+    from app.schemas.todo import TodoCreate
+
+    pool, pragmas = MODES[name]
+    defaults = {key: getattr(settings, key) for key in PRAGMA_SETTINGS}
+    settings.sqlite_pool = pool
+    settings.db_pool_size = readers + writers
+    if not pragmas:
+        for key in PRAGMA_SETTINGS:
+            setattr(settings, key, None)
+    try:
+        path = os.path.join(tempfile.mkdtemp(prefix="db-modes-"), "bench.db")
+        engine = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO users (id, email, hashed_password, is_active, created_at, updated_at) "
+                "VALUES (1, 'bench@example.com', 'x', 1, ?, ?)", (now, now))
+            conn.exec_driver_sql(
+                "INSERT INTO todos (title, description, is_done, owner_id, created_at, updated_at) "
+                "VALUES (?, 'seed', 0, 1, ?, ?)", [(f"seed {i}", now, now) for i in range(seed_todos)])
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        counts = {"read": 0, "write": 0, "error": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker(kind: str):
+            done = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    with session_factory() as db:
+                        repo = TodoRepository(db)
+                        if kind == "read":
+                            repo.get_all(owner_id=1, limit=20)
+                        else:
+                            repo.create(TodoCreate(title=f"bench {done}"), owner_id=1)
+                    done += 1
+                except Exception:
+                    errors += 1
+            with lock:
+                counts[kind] += done
+                counts["error"] += errors
+
+        threads = [threading.Thread(target=worker, args=("read",)) for _ in range(readers)]
+        threads += [threading.Thread(target=worker, args=("write",)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    finally:
+        for key, value in defaults.items():
+            setattr(settings, key, value)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--seed-todos", type=int, default=10000)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    for name in args.modes:
+        # Each mode in a fresh process: threads sharing one connection (static) can leave it corrupted
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            counts = pool.apply(run_mode, (name, args.readers, args.writers, args.duration, args.seed_todos))
+        print(f"{name:11s} reads/s={counts['read'] / args.duration:8.1f} "
+              f"writes/s={counts['write'] / args.duration:7.1f} errors={counts['error']}")
+
+
+if __name__ == "__main__":
+    main()
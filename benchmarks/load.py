@@ -0,0 +1,307 @@
+"""In-process load test: a scenario mix at fixed concurrency against a synthetic dataset.
+
+Loads a benchmarks.datagen dataset into a scratch SQLite file, then runs
+`concurrency` clients against the app through httpx's ASGI transport (no
+network, no server) for a fixed time. Each client repeatedly picks a scenario
+by weight and a user at random, from a seeded generator. Throughput and
+p50/p95/p99 latency are reported per scenario and written as JSON:
+
+    python -m benchmarks.load run --users 200 --todos 50 --concurrency 16 --duration 20 --output base.json
+    python -m benchmarks.load run --mix list=1,search=1 --output new.json
+    python -m benchmarks.load compare base.json new.json --threshold 10
+
+compare exits with status 1 when a scenario's latency percentile grew, or its
+throughput fell, by more than --threshold percent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+from benchmarks.datagen import BENCH_PASSWORD, DISTRIBUTIONS, WORDS, DatasetSpec, user_email
+
+DEFAULT_MIX = "list=40,search=15,overdue=10,today=10,create=10,complete=10,login=5"
+
+# Latency statistics (ms) compared between runs; higher is worse
+LATENCY_KEYS = ("p50", "p95", "p99")
+
+# Settings recorded with the results, since they change what is being measured
+RECORDED_SETTINGS = ("async_database", "fast_serialization", "fts_search", "sqlite_pool", "db_pool_size",
+                     "password_hash_rounds", "hash_executor", "metrics_enabled", "sql_trace_sample_rate")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class Client:
+    """One simulated user session: the HTTP client, a seeded generator and the dataset layout"""
+
+    def __init__(self, http, rng: random.Random, tokens: dict, todo_ranges: dict):
+        self.http = http
+        self.rng = rng
+        self.tokens = tokens
+        self.todo_ranges = todo_ranges
+
+    def user(self) -> int:
+        return self.rng.randint(1, len(self.tokens))
+
+    def headers(self, user_id: int) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+
+async def scenario_list(client: Client):
+    user_id = client.user()
+    return await client.http.get("/todos/", params={"limit": 20}, headers=client.headers(user_id))
+
+
+async def scenario_search(client: Client):
+    user_id = client.user()
+    q = client.rng.choice(WORDS)[:client.rng.randint(3, 6)]
+    return await client.http.get("/todos/", params={"q": q, "limit": 20}, headers=client.headers(user_id))
+
+
+async def scenario_overdue(client: Client):
+    user_id = client.user()
+    return await client.http.get("/todos/overdue", params={"limit": 20}, headers=client.headers(user_id))
+
+
+async def scenario_today(client: Client):
+    user_id = client.user()
+    return await client.http.get("/todos/today", params={"limit": 20}, headers=client.headers(user_id))
+
+
+async def scenario_create(client: Client):
+    user_id = client.user()
+    words = client.rng.sample(WORDS, 3)
+    body = {"title": " ".join(words), "description": "created under load", "tags": words[:2]}
+    return await client.http.post("/todos/", json=body, headers=client.headers(user_id))
+
+
+async def scenario_complete(client: Client):
+    user_id = client.user()
+    first_id, count = client.todo_ranges[user_id]
+    if not count:
+        return await scenario_create(client)
+    todo_id = first_id + client.rng.randrange(count)
+    return await client.http.post(f"/todos/{todo_id}/complete", headers=client.headers(user_id))
+
+
+async def scenario_login(client: Client):
+    user_id = client.user()
+    return await client.http.post("/auth/login", json={"email": user_email(user_id), "password": BENCH_PASSWORD})
+
+
+SCENARIOS = {
+    "list": scenario_list,
+    "search": scenario_search,
+    "overdue": scenario_overdue,
+    "today": scenario_today,
+    "create": scenario_create,
+    "complete": scenario_complete,
+    "login": scenario_login,
+}
+
+
+def summarize(latencies: dict, errors: dict, elapsed: float) -> dict:
+    """Per-scenario and total request counts, throughput and latency percentiles (ms)"""
+    def stats(samples, failed):
+        result = {"requests": len(samples), "errors": failed, "throughput": round(len(samples) / elapsed, 2)}
+        if samples:
+            result.update({
+                "mean": round(sum(samples) / len(samples), 3),
+                **{f"p{pct}": round(percentile(samples, pct), 3) for pct in (50, 95, 99)},
+                "max": round(max(samples), 3),
+            })
+        return result
+
+    scenarios = {name: stats(samples, errors[name]) for name, samples in latencies.items()}
+    everything = [sample for samples in latencies.values() for sample in samples]
+    return {"scenarios": scenarios, "total": stats(everything, sum(errors.values()))}
+
+
+async def drive(app, weights: dict, concurrency: int, duration: float, warmup: float,
+                tokens: dict, todo_ranges: dict, seed: int) -> dict:
+    import httpx
+
+    names = list(weights)
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1", timeout=None) as http:
+        started = time.perf_counter()
+        record_from = started + warmup
+        stop_at = record_from + duration
+
+        async def worker(index: int):
+            client = Client(http, random.Random(seed * 1000 + index), tokens, todo_ranges)
+            while True:
+                name = client.rng.choices(names, weights=[weights[name] for name in names])[0]
+                begin = time.perf_counter()
+                if begin >= stop_at:
+                    return
+                response = await SCENARIOS[name](client)
+                if begin < record_from:
+                    continue
+                latencies[name].append((time.perf_counter() - begin) * 1000)
+                if response.status_code >= 400:
+                    errors[name] += 1
+
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return summarize(latencies, errors, duration)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(args):
+    # A scratch database, set before the app (and its engines) is imported
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("PASSWORD_HASH_ROUNDS", str(args.hash_rounds))
+
+    from app.core.config import settings
+    from app.core.database import engine
+    from app.core.hashing import hashing_executor
+    from app.core.security import create_access_token, get_password_hash
+    from app.main import app, prepare_database
+    from benchmarks.datagen import generate
+
+    spec = DatasetSpec(users=args.users, todos_per_user=args.todos, distribution=args.distribution,
+                       tags=args.tags, seed=args.seed)
+    weights = parse_mix(args.mix)
+    # httpx's ASGI transport does not run the lifespan
+    prepare_database()
+    loaded = time.perf_counter()
+    todo_ranges = generate(engine, spec, get_password_hash(BENCH_PASSWORD))
+    print(f"loaded {spec.users} users, {sum(count for _, count in todo_ranges.values())} todos "
+          f"in {time.perf_counter() - loaded:.1f}s")
+    tokens = {user_id: create_access_token({"sub": user_email(user_id)}) for user_id in todo_ranges}
+
+    results = asyncio.run(drive(app, weights, args.concurrency, args.duration, args.warmup,
+                                tokens, todo_ranges, args.seed))
+    hashing_executor.shutdown()
+    results["meta"] = {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": weights,
+        "dataset": asdict(spec),
+        "settings": {key: getattr(settings, key) for key in RECORDED_SETTINGS},
+    }
+
+    print(f"concurrency={args.concurrency} duration={args.duration}s mix={args.mix}")
+    for name, stats in [*results["scenarios"].items(), ("total", results["total"])]:
+        if not stats["requests"]:
+            print(f"  {name:<9} no requests")
+            continue
+        print(f"  {name:<9} {stats['requests']:>7} req {stats['throughput']:>8.1f}/s "
+              f"p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms errors={stats['errors']}")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"results written to {args.output}")
+
+
+def compare(base: dict, new: dict, threshold: float, min_ms: float) -> list:
+    """Regressions of new against base: (scenario, metric, base value, new value, change %)"""
+    regressions = []
+    for name, new_stats in [*new["scenarios"].items(), ("total", new["total"])]:
+        base_stats = base["total"] if name == "total" else base["scenarios"].get(name)
+        if not base_stats or not base_stats["requests"] or not new_stats["requests"]:
+            continue
+        for key in LATENCY_KEYS:
+            before, after = base_stats[key], new_stats[key]
+            if after - before > min_ms and after > before * (1 + threshold / 100):
+                regressions.append((name, key, before, after, (after / before - 1) * 100))
+        before, after = base_stats["throughput"], new_stats["throughput"]
+        if after < before * (1 - threshold / 100):
+            regressions.append((name, "throughput", before, after, (after / before - 1) * 100))
+        base_rate = base_stats["errors"] / base_stats["requests"]
+        new_rate = new_stats["errors"] / new_stats["requests"]
+        if new_rate > base_rate + threshold / 100:
+            regressions.append((name, "error rate", round(base_rate, 4), round(new_rate, 4), (new_rate - base_rate) * 100))
+    return regressions
+
+
+def run_compare(args):
+    with open(args.base) as base_file, open(args.new) as new_file:
+        base, new = json.load(base_file), json.load(new_file)
+    for label, results in (("base", base), ("new", new)):
+        meta = results.get("meta", {})
+        print(f"{label}: {meta.get('revision') or '?'} at {meta.get('timestamp', '?')}, "
+              f"concurrency={meta.get('concurrency')}, dataset={meta.get('dataset')}")
+    for key in ("dataset", "mix", "concurrency"):
+        if base.get("meta", {}).get(key) != new.get("meta", {}).get(key):
+            print(f"warning: the runs used a different {key}")
+
+    regressions = compare(base, new, args.threshold, args.min_ms)
+    for name, metric, before, after, change in regressions:
+        print(f"  REGRESSION {name} {metric}: {before} -> {after} ({change:+.1f}%)")
+    if not regressions:
+        print(f"no regressions beyond {args.threshold}%")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="load a dataset and drive the scenario mix")
+    run_parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    run_parser.add_argument("--todos", type=int, default=DatasetSpec.todos_per_user, help="mean todos per user")
+    run_parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=DatasetSpec.distribution)
+    run_parser.add_argument("--tags", type=int, default=DatasetSpec.tags)
+    run_parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... from: " + ", ".join(SCENARIOS))
+    run_parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    run_parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds first")
+    run_parser.add_argument("--hash-rounds", type=int, default=12, help="bcrypt rounds, unless PASSWORD_HASH_ROUNDS is set")
+    run_parser.add_argument("--output", help="write results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    compare_parser.add_argument("--min-ms", type=float, default=0.5, help="ignore latency changes smaller than this")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        run_compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Todo-endpoint latency during a login storm.
+
+Fires concurrent logins at the app in-process while a probe client polls
+GET /todos/, then reports probe latency percentiles. Compare the modes:
+
+    python -m benchmarks.login_storm --mode inline   # bcrypt on the event loop (old behaviour)
+    python -m benchmarks.login_storm --mode thread
+    python -m benchmarks.login_storm --mode process
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode: str, storm: int, duration: float):
+    import httpx
+    from app.core import security
+    from app.core.hashing import HashingExecutor
+    from app.main import app, prepare_database
+
+    if mode == "inline":
+        async def run_inline(fn, *args):
+            return fn(*args)
+        security.hashing_executor.run = run_inline
+    else:
+        security.hashing_executor = HashingExecutor(kind=mode)
+
+    # httpx's ASGI transport does not run the lifespan
+    prepare_database()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+        credentials = {"email": "storm@example.com", "password": "password123"}
+        response = await client.post("/auth/register", json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        for i in range(20):
+            await client.post("/todos/", json={"title": f"bench todo {i}"}, headers=headers)
+
+        stop_at = time.perf_counter() + duration
+        logins = {"ok": 0, "busy": 0}
+        latencies = []
+
+        async def login_worker():
+            while time.perf_counter() < stop_at:
+                response = await client.post("/auth/login", json=credentials)
+                logins["ok" if response.status_code == 200 else "busy"] += 1
+
+        async def probe():
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                await client.get("/todos/", headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(probe(), *(login_worker() for _ in range(storm)))
+        security.hashing_executor.shutdown()
+
+    print(f"mode={mode} storm={storm} duration={duration}s")
+    print(f"  logins: {logins['ok']} ok, {logins['busy']} rejected (503)")
+    print(f"  GET /todos/ samples={len(latencies)} "
+          f"p50={statistics.median(latencies):.1f}ms "
+          f"p99={percentile(latencies, 99):.1f}ms "
+          f"max={max(latencies):.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inline", "thread", "process"], default="process")
+    parser.add_argument("--storm", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    # Run against a throwaway SQLite file
+    os.chdir(tempfile.mkdtemp(prefix="login-storm-"))
+    asyncio.run(run(args.mode, args.storm, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Memory and time per list page: ORM entities vs. selected rows.
+
+Loads one user's todos into an in-memory SQLite database and reads the
+first page the way the list endpoint does, turning it into response dicts:
+
+    orm:   Query(Todo) with selectinload(tags): identity map, instrumented
+           entities and Tag objects, copied into dicts and discarded
+    rows:  TodoRepository.get_all: select() of the response columns into
+           TodoRow namedtuples, tags from one keyed query
+
+Each page uses a fresh session. Allocation is the tracemalloc peak while the
+page is built, above what was allocated before it started:
+
+    python -m benchmarks.read_path --todos 1000 --page 100
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.datagen import DatasetSpec, generate
+
+
+def orm_page(session, page: int):
+    from sqlalchemy import desc
+    from sqlalchemy.orm import selectinload
+    from app.models import Todo
+    from app.utils.serialization import todo_dict
+
+    todos = (
+        session.query(Todo).options(selectinload(Todo.tags))
+        .filter(Todo.owner_id == 1)
+        .order_by(desc(Todo.created_at), desc(Todo.id))
+        .limit(page + 1).all()
+    )
+    return [todo_dict(todo) for todo in todos[:page]]
+
+
+def rows_page(session, page: int):
+    from app.repositories.todo_repo import TodoRepository
+    from app.utils.serialization import todo_dict
+
+    items = TodoRepository(session).get_all(owner_id=1, limit=page).items
+    return [todo_dict(todo) for todo in items]
+
+
+def measure(engine, fn, page: int, repeat: int):
+    """Median seconds and median peak KiB allocated per page"""
+    from sqlalchemy.orm import Session
+
+    seconds, peaks = [], []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            fn(session, page)
+            seconds.append(time.perf_counter() - started)
+        with Session(engine) as session:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            fn(session, page)
+            peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+            tracemalloc.stop()
+    return statistics.median(seconds), statistics.median(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=1000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--tags", type=int, default=20, help="distinct tag names (up to 3 per todo)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from app.models import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    generate(engine, DatasetSpec(users=1, todos_per_user=args.todos, distribution="fixed", tags=args.tags),
+             hashed_password="x")
+
+    for label, fn in [("orm", orm_page), ("rows", rows_page)]:
+        fn_seconds, peak_kib = measure(engine, fn, args.page, args.repeat)
+        print(f"{label:5s} page={fn_seconds * 1000:.2f}ms per item={fn_seconds / args.page * 1e6:.1f}us "
+              f"peak={peak_kib:.0f}KiB per item={peak_kib * 1024 / args.page:.0f}B")
+
+
+if __name__ == "__main__":
+    main()
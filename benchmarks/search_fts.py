@@ -0,0 +1,117 @@
+"""LIKE vs FTS5 search over a large todo table.
+
+Bulk-loads N todos spread over many owners into a throwaway SQLite file, builds
+the FTS5 index and times TodoRepository.get_all(q=...) through LIKE, the
+owner-scoped FTS5 index, and the default (FTS5 only for owners with at least
+FTS_MIN_TODOS todos), for a sample of the owners:
+
+    python -m benchmarks.search_fts --todos 300000 --owners 1000 --sample 50
+
+Many owners is the case that matters: each owner's search must cost what their
+own todos cost, not what the whole table costs.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+WORDS = (
+    "buy call email fix review write plan book pay clean send read update deploy test "
+    "groceries invoice report meeting dentist budget garden laundry taxes slides "
+    "contract backup release newsletter insurance passport birthday recipe workout"
+).split()
+
+
+def load(engine, todos: int, owners: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email, hashed_password, is_active, created_at, updated_at) VALUES (?, ?, 'x', 1, ?, ?)",
+            [(i, f"user{i}@example.com", now, now) for i in range(1, owners + 1)],
+        )
+        batch = []
+        for i in range(todos):
+            title = " ".join(rng.choices(WORDS, k=3))
+            description = " ".join(rng.choices(WORDS, k=12))
+            batch.append((title, description, rng.random() < 0.3, i % owners + 1, now, now))
+            if len(batch) == 50000:
+                conn.exec_driver_sql(
+                    "INSERT INTO todos (title, description, is_done, owner_id, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.exec_driver_sql(
+                "INSERT INTO todos (title, description, is_done, owner_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+
+def time_queries(session_factory, queries, owner_ids, sort=None, repeat: int = 3):
+    from app.repositories.todo_repo import TodoRepository
+
+    samples = []
+    with session_factory() as db:
+        repo = TodoRepository(db)
+        for _ in range(repeat):
+            for owner_id in owner_ids:
+                for q in queries:
+                    started = time.perf_counter()
+                    repo.get_all(owner_id=owner_id, q=q, sort=sort, limit=20)
+                    samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=300_000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=50, help="owners whose searches are timed")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core import search
+    from app.core.config import settings
+    from app.models import Base
+
+    path = os.path.join(tempfile.mkdtemp(prefix="search-fts-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    load(engine, args.todos, args.owners, args.seed)
+    print(f"loaded {args.todos} todos for {args.owners} owners in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    if not search.install_fts(engine):
+        raise SystemExit("SQLite was built without FTS5")
+    print(f"built FTS5 index in {time.perf_counter() - started:.1f}s")
+
+    session_factory = sessionmaker(bind=engine)
+    queries = ["invoice", "groc", "review report", "passport"]
+    # (label, fts_search, fts_min_todos, sort): the default threshold picks a path per owner
+    default_threshold = settings.fts_min_todos
+    runs = [
+        ("LIKE", False, default_threshold, None),
+        ("FTS5", True, 0, None),
+        ("FTS5 sort=relevance", True, 0, "relevance"),
+        ("default", True, default_threshold, None),
+        ("default relevance", True, default_threshold, "relevance"),
+    ]
+    owner_ids = random.Random(args.seed).sample(range(1, args.owners + 1), min(args.sample, args.owners))
+    baseline = None
+    for label, use_fts, threshold, sort in runs:
+        settings.fts_search, settings.fts_min_todos = use_fts, threshold
+        samples = time_queries(session_factory, queries, owner_ids, sort=sort)
+        median = statistics.median(samples)
+        baseline = baseline or median
+        print(f"{label:20s} n={len(samples)} median={median:.1f}ms max={max(samples):.1f}ms "
+              f"({median / baseline:.2f}x LIKE)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Per-item serialization cost of a todo list page.
+
+Builds pages of ORM todos (with tags) in memory and times turning them into
+response bytes the way the list endpoints do, with and without
+fast_serialization:
+
+    validated: Todo.from_orm per item, then FastAPI re-validates against
+               response_model, runs jsonable_encoder and json.dumps
+    fast:      a plain dict per item, then pydantic_core.to_json
+
+    python -m benchmarks.serialization --items 100 --tags 3
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+
+def make_page(items: int, tags: int):
+    from app.models import Tag, Todo
+
+    now = datetime.utcnow()
+    shared_tags = [Tag(id=i, name=f"tag-{i}") for i in range(tags)]
+    todos = []
+    for i in range(items):
+        todo = Todo(id=i, title=f"Todo number {i}", description="Some longer description " * 4,
+                    is_done=i % 3 == 0, due_date=now + timedelta(days=i), owner_id=1,
+                    created_at=now, updated_at=now)
+        todo.tags = list(shared_tags)
+        todos.append(todo)
+    return todos
+
+
+def run_coroutine(coro):
+    """Drive a coroutine that never suspends (serialize_response with is_coroutine=True)"""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def validated(todos, field):
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from app.schemas.todo import Todo, TodoListResponse
+
+    page = TodoListResponse(items=[Todo.from_orm(todo) for todo in todos], total=len(todos), limit=len(todos), offset=0)
+    content = run_coroutine(serialize_response(field=field, response_content=page))
+    return JSONResponse(content).body
+
+
+def fast(todos):
+    from pydantic_core import to_json
+    from app.utils.serialization import todo_dict
+
+    page = {"items": [todo_dict(todo) for todo in todos], "total": len(todos), "limit": len(todos),
+            "offset": 0, "next_cursor": None, "estimated": False}
+    return to_json(page)
+
+
+def measure(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--tags", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    from fastapi.utils import create_model_field
+    from app.schemas.todo import TodoListResponse
+
+    todos = make_page(args.items, args.tags)
+    field = create_model_field(name="Response", type_=TodoListResponse)
+    runs = [
+        ("validated", lambda: validated(todos, field)),
+        ("fast", lambda: fast(todos)),
+    ]
+    for label, fn in runs:
+        median = measure(fn, args.repeat)
+        print(f"{label:10s} page={median * 1000:.2f}ms per item={median / args.items * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,192 @@
-# Test configuration
-# Will be implemented in Level 7
+# Test configuration: an in-memory SQLite database, one rolled-back transaction per test,
+# and per-call SQL statement budgets.
+#
+# Mark a test with @pytest.mark.query_budget(n) and make the call under test through the
+# `measured` fixture: it fails if that single TestClient call runs more than n statements.
+#
+# Tests using `client` run twice: on the sync engine, and on the async engine with
+# ASYNC_DATABASE on (each engine has its own in-memory database), so budgets hold on both paths.
 
-# import pytest
-# from fastapi.testclient import TestClient
-# from app.main import app
+import os
 
-# TODO: Implement in Level 7
-pass
\ No newline at end of file
+# Must be set before the app (and its engines) is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ASYNC_DATABASE", "false")
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("HASH_EXECUTOR", "thread")
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import replicas
+from app.core.config import settings
+from app.core.data_version import data_versions
+from app.core.database import Base, engine, get_async_engine, get_session
+from app.core.principal_cache import principal_cache
+from app.main import app
+from app.core.search import install_fts
+from app.repositories.tag_repo import tag_id_cache
+from app.utils.query_counter import count_queries
+
+# Transaction control the per-test rollback adds around each commit; not part of a budget
+TEST_ONLY_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+# Built on demand by the app (ASYNC_DATABASE is off here); the async runs of `client` use it
+async_engine = get_async_engine()
+
+
+# pysqlite defers BEGIN on its own, which breaks SAVEPOINTs: let SQLAlchemy emit it instead
+# (aiosqlite wraps pysqlite, so the async engine needs the same)
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+@event.listens_for(async_engine.sync_engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# The app already opened the in-memory database: reopen it with the listeners above
+engine.dispose()
+Base.metadata.create_all(bind=engine)
+install_fts(engine)
+
+
+async def _create_async_schema():
+    async with async_engine.connect() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.commit()
+        await connection.run_sync(lambda sync_connection: install_fts(sync_connection.engine))
+
+asyncio.run(_create_async_schema())
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "query_budget(n): the `measured` call may run at most n SQL statements")
+
+
+@pytest.fixture
+def db_session():
+    """A session inside an outer transaction that is rolled back after the test (commits become savepoints)"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        # Cached ids and versions may refer to rolled-back rows
+        principal_cache.clear()
+        tag_id_cache.clear()
+        data_versions.clear()
+
+
+@pytest.fixture
+def async_db_session():
+    """Like db_session, on the async engine: an AsyncSession in an outer transaction that is rolled back"""
+    async def begin():
+        connection = await async_engine.connect()
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False,
+                               join_transaction_mode="create_savepoint")
+        return connection, transaction, session
+
+    async def end():
+        await session.close()
+        await transaction.rollback()
+        await connection.close()
+
+    # Neither the connection nor the session is tied to an event loop: each TestClient call runs its own
+    connection, transaction, session = asyncio.run(begin())
+    try:
+        yield session
+    finally:
+        asyncio.run(end())
+
+
+@pytest.fixture(params=["sync", "async"])
+def request_db(request, db_session, monkeypatch):
+    """(session, engine) requests run on: db_session, or an AsyncSession with ASYNC_DATABASE on"""
+    if request.param == "sync":
+        return db_session, engine
+    monkeypatch.setattr(settings, "async_database", True)
+    return request.getfixturevalue("async_db_session"), async_engine
+
+
+@pytest.fixture
+def client(request_db, monkeypatch):
+    """TestClient whose requests, and sessions opened outside them (exports), all use the request_db session"""
+    db_session, _ = request_db
+
+    def override_session():
+        yield db_session
+
+    @asynccontextmanager
+    async def open_test_session(*args, **kwargs):
+        yield db_session
+
+    app.dependency_overrides[get_session] = override_session
+    monkeypatch.setattr(replicas, "open_session", open_test_session)
+    try:
+        # Not entered as a context manager: the lifespan's schema setup is done above, outside the test transaction
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def measured(request, client, request_db):
+    """measured(method, url, **kwargs): one client call, held to the test's query_budget"""
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        pytest.fail("Tests using `measured` need @pytest.mark.query_budget(n)")
+    budget = marker.args[0]
+    _, db_engine = request_db
+
+    def call(method: str, url: str, **kwargs):
+        with count_queries(db_engine) as counter:
+            response = client.request(method, url, **kwargs)
+        statements = [
+            statement for statement in counter.statements
+            if not statement.lstrip().upper().startswith(TEST_ONLY_STATEMENTS)
+        ]
+        listing = "\n".join(f"  {statement}" for statement in statements)
+        assert len(statements) <= budget, (
+            f"{method} {url} ran {len(statements)} statements, budget is {budget}:\n{listing}"
+        )
+        return response
+
+    return call
+
+
+@pytest.fixture
+def credentials() -> dict:
+    return {"email": "alice@example.com", "password": "password123"}
+
+
+@pytest.fixture
+def token(client, credentials) -> str:
+    """Access token of a freshly registered user"""
+    response = client.post("/api/v1/auth/register", json=credentials)
+    assert response.status_code == 201, response.text
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+def auth_headers(client, token) -> dict:
+    """Authorization header of the registered user, whose principal a first call has cached"""
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    return headers
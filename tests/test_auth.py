@@ -1,8 +1,51 @@
-# Auth tests
-# Will be implemented in Level 7
+# Auth endpoint behaviour and per-call SQL budgets
 
-# import pytest
-# from fastapi.testclient import TestClient
+import pytest
 
-# TODO: Implement in Level 7
-pass
\ No newline at end of file
+
+@pytest.mark.query_budget(3)
+def test_register(measured, credentials):
+    # SELECT the email, INSERT the user, reload it for the response
+    response = measured("POST", "/api/v1/auth/register", json=credentials)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["user"]["email"] == credentials["email"]
+    assert body["access_token"]
+
+
+@pytest.mark.query_budget(1)
+def test_register_duplicate_email(measured, token, credentials):
+    response = measured("POST", "/api/v1/auth/register", json=credentials)
+    assert response.status_code == 400
+
+
+@pytest.mark.query_budget(1)
+def test_login(measured, token, credentials):
+    response = measured("POST", "/api/v1/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+@pytest.mark.query_budget(1)
+def test_login_wrong_password(measured, token, credentials):
+    response = measured("POST", "/api/v1/auth/login", json={**credentials, "password": "wrong-password"})
+    assert response.status_code == 401
+
+
+@pytest.mark.query_budget(1)
+def test_me_first_call_loads_user(measured, token, credentials):
+    response = measured("GET", "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["email"] == credentials["email"]
+
+
+@pytest.mark.query_budget(0)
+def test_me_cached_principal(measured, auth_headers):
+    response = measured("GET", "/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget(0)
+def test_me_invalid_token(measured):
+    response = measured("GET", "/api/v1/auth/me", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
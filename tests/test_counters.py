@@ -0,0 +1,34 @@
+# Per-owner todo counters: one upsert per write, seeded from the todos table on an owner's first write
+
+from sqlalchemy import delete
+
+from app.core.database import engine
+from app.models.todo_counter import TodoCounter
+from app.repositories.counter_repo import TodoCounterRepository
+from app.repositories.todo_repo import TodoRepository
+from app.schemas.todo import TodoCreate
+from app.utils.query_counter import count_queries
+
+OWNER = 1
+
+
+def test_first_bump_seeds_from_todos(db_session):
+    # An owner with todos but no counter row (e.g. written before counters existed)
+    TodoRepository(db_session).create_many([TodoCreate(title="One", is_done=True), TodoCreate(title="Two")], OWNER)
+    db_session.execute(delete(TodoCounter).where(TodoCounter.owner_id == OWNER))
+
+    counters = TodoCounterRepository(db_session)
+    counters.bump(OWNER, total=1)  # the seed already counts the change; the delta is not added again
+    counter = counters.get(OWNER)
+    assert (counter.total, counter.done, counter.version) == (2, 1, 1)
+
+
+def test_bump_is_one_statement(db_session):
+    TodoRepository(db_session).create(TodoCreate(title="One"), OWNER)
+    counters = TodoCounterRepository(db_session)
+    # The row exists: the upsert applies the deltas and counts nothing
+    with count_queries(engine) as counter:
+        counters.bump(OWNER, total=1, done=1)
+    assert len([statement for statement in counter.statements if "todo_counters" in statement]) == 1
+    row = counters.get(OWNER)
+    assert (row.total, row.done, row.version) == (2, 1, 2)
@@ -0,0 +1,49 @@
+# Data version cache: a version read while a write commits is not cached
+
+from datetime import datetime
+
+from app.core.data_version import DataVersion, DataVersionCache
+
+OWNER = 1
+OLD = DataVersion(version=1, modified_at=datetime(2026, 1, 1), next_due=None)
+
+
+def test_read_is_cached():
+    cache = DataVersionCache(maxsize=10, ttl=60)
+    with cache.reading(OWNER) as store:
+        store(OLD)
+    assert cache.get(OWNER) == OLD
+
+
+def test_read_overlapping_a_write_is_not_cached():
+    cache = DataVersionCache(maxsize=10, ttl=60)
+    with cache.reading(OWNER) as store:
+        # A write commits after the read fetched the version, before it is stored
+        cache.invalidate(OWNER)
+        store(OLD)
+    assert cache.get(OWNER) is None
+    # The next read is cached again
+    with cache.reading(OWNER) as store:
+        store(OLD)
+    assert cache.get(OWNER) == OLD
+
+
+def test_write_of_another_owner_does_not_block():
+    cache = DataVersionCache(maxsize=10, ttl=60)
+    with cache.reading(OWNER) as store:
+        cache.invalidate(OWNER + 1)
+        store(OLD)
+    assert cache.get(OWNER) == OLD
+
+
+def test_overlapping_reads():
+    cache = DataVersionCache(maxsize=10, ttl=60)
+    with cache.reading(OWNER) as first:
+        cache.invalidate(OWNER)
+        with cache.reading(OWNER) as second:
+            # Began after the write: sees it
+            second(OLD._replace(version=2))
+        assert cache.get(OWNER).version == 2
+        first(OLD)
+    assert cache.get(OWNER).version == 2
+    assert not cache._readers and not cache._last_invalidated
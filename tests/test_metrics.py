@@ -0,0 +1,38 @@
+# Metric shards: one per live thread, folded into a base total when the thread exits
+
+import threading
+
+from app.core.metrics import Counter, Histogram, http_request_duration
+
+
+def run_threads(target, count=20):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_exited_threads_fold_into_base():
+    counter = Counter("test_total", "Test counter", ["kind"])
+    histogram = Histogram("test_seconds", "Test histogram", buckets=(1.0,))
+
+    def work():
+        counter.inc("a")
+        histogram.observe(0.5)
+
+    run_threads(work)
+    run_threads(work)
+    assert counter._shards == [] and histogram._shards == []
+    assert list(counter.samples()) == [("test_total", {"kind": "a"}, 40)]
+    samples = {name: value for name, labels, value in histogram.samples()}
+    assert samples == {"test_seconds_bucket": 40, "test_seconds_sum": 20.0, "test_seconds_count": 40}
+
+
+def test_unknown_methods_are_labelled_other(client):
+    for method in ("GET", "BREW", "PROPFIND"):
+        client.request(method, "/health")
+    methods = {labels["method"] for name, labels, _ in http_request_duration.samples()
+               if name == "http_request_duration_seconds_count"}
+    assert "GET" in methods and "other" in methods
+    assert not methods & {"BREW", "PROPFIND"}
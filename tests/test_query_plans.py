@@ -0,0 +1,122 @@
+# Every TodoRepository query is served by an index: EXPLAIN QUERY PLAN shows no full
+# table scan and no temp B-tree sort.
+#
+# Relevance-ranked search (sort=relevance) is left out: it orders by a computed bm25
+# score, which no index can provide.
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import Base, engine
+from app.repositories.tag_repo import tag_id_cache
+from app.repositories.todo_repo import TodoRepository
+from app.schemas.todo import TODO_SORTS, TodoBatchUpdate, TodoCreate, TodoUpdate
+
+OWNER = 1
+
+def with_fts(call):
+    """call() with searches on the full-text index, whatever the owner's number of todos"""
+    threshold, settings.fts_min_todos = settings.fts_min_todos, 0
+    try:
+        return call()
+    finally:
+        settings.fts_min_todos = threshold
+
+
+# Each call exercises one query shape; it gets the repository and the id of an open todo
+CALLS = {
+    "list": lambda repo, todo_id: repo.get_all(OWNER, limit=2),
+    "list_oldest_first": lambda repo, todo_id: repo.get_all(OWNER, sort="created_at", limit=2),
+    "list_next_page": lambda repo, todo_id: repo.get_all(OWNER, limit=2, cursor=repo.get_all(OWNER, limit=2).next_cursor),
+    "list_done": lambda repo, todo_id: repo.get_all(OWNER, is_done=True, limit=2),
+    "list_search": lambda repo, todo_id: repo.get_all(OWNER, q="invoice", limit=2),
+    "list_search_fts": lambda repo, todo_id: with_fts(lambda: repo.get_all(OWNER, q="invoice", limit=1)),
+    "export_search_fts": lambda repo, todo_id: with_fts(
+        lambda: repo.db.execute(repo.export_statement(OWNER, q="invoice")).all()),
+    "list_sparse": lambda repo, todo_id: repo.get_all(OWNER, limit=2, fields=("id", "title")),
+    "overdue": lambda repo, todo_id: repo.get_overdue(OWNER, limit=2),
+    "overdue_next_page": lambda repo, todo_id: repo.get_overdue(OWNER, limit=1, cursor=repo.get_overdue(OWNER, limit=1).next_cursor),
+    "today": lambda repo, todo_id: repo.get_today(OWNER, limit=2),
+    "get": lambda repo, todo_id: repo.get_by_id(todo_id, OWNER),
+    "data_version": lambda repo, todo_id: repo.data_version(OWNER),
+    "export": lambda repo, todo_id: repo.db.execute(repo.export_statement(OWNER, is_done=False)).all(),
+    # An uncached existing tag: "work" is looked up after the insert of the new tags skips it
+    "create": lambda repo, todo_id: (tag_id_cache.clear(), repo.create(TodoCreate(title="Another one", tags=["new", "work"]), OWNER)),
+    "update": lambda repo, todo_id: repo.update(todo_id, TodoUpdate(title="Renamed", is_done=True, tags=["home"]), OWNER),
+    "complete": lambda repo, todo_id: repo.mark_complete(todo_id, OWNER),
+    "delete": lambda repo, todo_id: repo.delete(todo_id, OWNER),
+    "batch": lambda repo, todo_id: repo.batch(
+        OWNER, creates=[TodoCreate(title="Batch one", tags=["work"])],
+        updates=[TodoBatchUpdate(id=todo_id, title="Batch renamed", tags=["home"])],
+        completes=[todo_id + 1], deletes=[todo_id + 2],
+    ),
+}
+
+
+def sorted_pages(sort, **filters):
+    """First and second page of a list sort (the second seeks past a cursor)"""
+    def call(repo, todo_id):
+        first = repo.get_all(OWNER, sort=sort, limit=2, **filters)
+        repo.get_all(OWNER, sort=sort, limit=2, cursor=first.next_cursor, **filters)
+    return call
+
+
+# Every sort a list accepts, alone and filtered by is_done
+for sort in TODO_SORTS:
+    CALLS[f"list_sort={sort}"] = sorted_pages(sort)
+    CALLS[f"list_open_sort={sort}"] = sorted_pages(sort, is_done=False)
+
+FULL_SCAN = re.compile(r"SCAN (\w+)")
+
+
+@pytest.fixture
+def repo(db_session):
+    """Repository over a few todos of OWNER (and one of another owner), with tags and due dates"""
+    repo = TodoRepository(db_session)
+    now = datetime.utcnow()
+    repo.create_many([TodoCreate(title="Someone else's", tags=["work"])], OWNER + 1)
+    repo.create_many([
+        TodoCreate(title="Write invoice report", tags=["work", "urgent"]),
+        TodoCreate(title="Pay the invoice", tags=["home"], due_date=now - timedelta(days=1)),
+        TodoCreate(title="Call the bank", due_date=now - timedelta(hours=1)),
+        TodoCreate(title="Buy groceries", tags=["home"], due_date=now + timedelta(minutes=5)),
+        TodoCreate(title="Done already", is_done=True),
+    ], OWNER)
+    return repo
+
+
+def query_plans(connection, statements):
+    """(statement, plan details) for each query, UPDATE and DELETE, planned with its parameters"""
+    for statement, parameters in statements:
+        if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            yield statement, [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", list(CALLS))
+def test_query_plan(name, repo):
+    todo_id = repo.get_all(OWNER, is_done=False, sort="created_at", limit=1).items[0].id
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        CALLS[name](repo, todo_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    tables = set(Base.metadata.tables)
+    planned = list(query_plans(repo.db.connection(), statements))
+    assert planned
+    for statement, details in planned:
+        for detail in details:
+            scan = FULL_SCAN.match(detail)
+            assert not (scan and scan.group(1) in tables), f"Full scan in {statement}:\n{details}"
+            assert "TEMP B-TREE" not in detail, f"Sort in {statement}:\n{details}"
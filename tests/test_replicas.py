@@ -0,0 +1,77 @@
+# Read replicas: a second engine on its own database stands in for the replica, so every
+# statement shows which database a request read from.
+
+import asyncio
+
+import pytest
+
+from app.core import database, replicas
+from app.core.config import settings
+from app.core.database import Base
+from app.core.replicas import Replica, replica_router
+from app.core.search import install_fts
+from app.utils.cache import LRUCache
+from app.utils.query_counter import count_queries
+
+TODOS = "/api/v1/todos"
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """A replica on an empty copy of the schema, with its sessions counted as they open"""
+    replica = Replica(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica.engine)
+    install_fts(replica.engine)
+    replica.opened = 0
+    # The engine its sessions use in this run's mode
+    replica.request_engine = replica.async_engine if settings.async_database else replica.engine
+    open_session = replica.open_session
+
+    def counted_open_session():
+        replica.opened += 1
+        return open_session()
+
+    monkeypatch.setattr(replica, "open_session", counted_open_session)
+    # The client fixture points every session at the test transaction; the replica keeps its own
+    monkeypatch.setattr(replicas, "open_session", database.open_session)
+    monkeypatch.setattr(replica_router, "replicas", [replica])
+    monkeypatch.setattr(replica_router, "_recent_writers", LRUCache(maxsize=100, ttl=60))
+    try:
+        yield replica
+    finally:
+        replica.engine.dispose()
+        if "async_engine" in vars(replica):
+            asyncio.run(replica.async_engine.dispose())
+
+
+def test_writes_use_the_primary_only(client, replica, auth_headers):
+    with count_queries(replica.request_engine) as on_replica:
+        response = client.post(f"{TODOS}/", json={"title": "Written"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert (replica.opened, on_replica.count) == (0, 0)
+
+
+def test_reads_follow_writes_then_move_to_the_replica(client, request_db, replica, auth_headers):
+    _, primary = request_db
+    client.post(f"{TODOS}/", json={"title": "Written"}, headers=auth_headers)
+
+    # Within the read-your-writes window: the primary, which has the new todo
+    with count_queries(replica.request_engine) as on_replica, count_queries(primary) as on_primary:
+        response = client.get(f"{TODOS}/", headers=auth_headers)
+    assert [todo["title"] for todo in response.json()["items"]] == ["Written"]
+    assert (replica.opened, on_replica.count) == (0, 0) and on_primary.count > 0
+
+    # Once the window has passed: the replica, which (not replicating here) has nothing
+    replica_router._recent_writers.clear()
+    with count_queries(replica.request_engine) as on_replica, count_queries(primary) as on_primary:
+        response = client.get(f"{TODOS}/", headers=auth_headers)
+    assert response.json()["items"] == []
+    assert replica.opened == 1 and on_replica.count > 0 and on_primary.count == 0
+
+
+def test_replica_builds_only_the_engine_in_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "async_database", False)
+    replica = Replica(f"sqlite:///{tmp_path / 'replica.db'}")
+    assert replica.busy() == 0
+    assert "engine" in vars(replica) and "async_engine" not in vars(replica)
+    replica.engine.dispose()
@@ -0,0 +1,46 @@
+# SQL tracing: statements of a traced request are grouped by shape with their time and rows
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.sql_trace import RequestTrace, current_trace, install_tracer
+
+
+@pytest.fixture
+def traced_engine(monkeypatch):
+    """A fresh in-memory engine with the tracer installed and a trace active"""
+    monkeypatch.setattr(settings, "sql_trace_sample_rate", 1.0)
+    traced = create_engine("sqlite://", poolclass=StaticPool)
+    install_tracer(traced)
+    with traced.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    try:
+        yield traced, trace
+    finally:
+        current_trace.reset(token)
+        traced.dispose()
+
+
+def rows_of(trace, shape):
+    return trace.shapes[shape].rows
+
+
+def test_select_reports_rows_fetched(traced_engine):
+    traced, trace = traced_engine
+    with traced.connect() as conn:
+        assert len(conn.execute(text("SELECT id FROM items")).all()) == 3
+        assert conn.execute(text("SELECT id FROM items WHERE id = 1")).first() is not None
+    assert rows_of(trace, "SELECT id FROM items WHERE id = ?") == 1
+    assert rows_of(trace, "SELECT id FROM items") == 3
+
+
+def test_write_reports_rows_changed(traced_engine):
+    traced, trace = traced_engine
+    with traced.begin() as conn:
+        conn.execute(text("UPDATE items SET name = 'x' WHERE id > 1"))
+    assert rows_of(trace, "UPDATE items SET name = ? WHERE id > ?") == 2
@@ -0,0 +1,18 @@
+# The tag name -> id cache only holds ids of committed tags
+
+from app.repositories.tag_repo import TagRepository, tag_id_cache
+
+
+def test_rolled_back_tags_are_not_cached(db_session):
+    [tag_id] = TagRepository(db_session).resolve(["fresh"])
+    db_session.rollback()
+    assert tag_id_cache.get("fresh") is None
+    # A later transaction creates the tag again instead of linking a missing id
+    assert TagRepository(db_session).resolve(["fresh"]) != [None]
+
+
+def test_committed_tags_are_cached(db_session):
+    [tag_id] = TagRepository(db_session).resolve(["fresh"])
+    assert tag_id_cache.get("fresh") is None
+    db_session.commit()
+    assert tag_id_cache.get("fresh") == tag_id
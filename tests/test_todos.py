@@ -1,8 +1,416 @@
-# Todo tests
-# Will be implemented in Level 7
+# Todo endpoint behaviour and per-call SQL budgets
+#
+# Budgets count statements with a warm principal cache (auth_headers has made one call),
+# and exclude the SAVEPOINTs the per-test rollback adds. The first read after a write
+# also looks up the owner's data version for its ETag (2 statements).
 
-# import pytest
-# from fastapi.testclient import TestClient
+import base64
+import json
+from datetime import datetime, timedelta
 
-# TODO: Implement in Level 7
-pass
\ No newline at end of file
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.repositories.todo_repo import TodoRepository
+
+TODOS = "/api/v1/todos"
+
+
+@pytest.fixture
+def todos(client, auth_headers):
+    """Three todos with tags (one done, one overdue, one due later today); returns their ids"""
+    now = datetime.utcnow()
+    end_of_day = now.replace(hour=23, minute=59, second=0, microsecond=0)
+    bodies = [
+        {"title": "Write invoice report", "tags": ["work", "urgent"]},
+        {"title": "Pay the invoice", "tags": ["home"], "due_date": (now - timedelta(days=1)).isoformat()},
+        {"title": "Buy groceries", "tags": ["home", "errand"],
+         "due_date": (end_of_day if end_of_day > now else now + timedelta(minutes=1)).isoformat()},
+    ]
+    ids = []
+    for body in bodies:
+        response = client.post(f"{TODOS}/", json=body, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    response = client.post(f"{TODOS}/{ids[0]}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    return ids
+
+
+@pytest.mark.query_budget(4)
+def test_create_with_tags(measured, todos, auth_headers):
+    response = measured("POST", f"{TODOS}/", json={"title": "Plan the week", "tags": ["b", "a"]},
+                        headers=auth_headers)
+    assert response.status_code == 201
+    assert [tag["name"] for tag in response.json()["tags"]] == ["a", "b"]
+
+
+@pytest.mark.query_budget(2)
+def test_create_without_tags(measured, todos, auth_headers):
+    response = measured("POST", f"{TODOS}/", json={"title": "Plan the week"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["tags"] == []
+
+
+@pytest.mark.query_budget(3)
+def test_create_with_known_tags(measured, todos, auth_headers):
+    # Tag ids cached by the fixture's creates: no lookup, no insert
+    response = measured("POST", f"{TODOS}/", json={"title": "Another chore", "tags": ["home", "work"]},
+                        headers=auth_headers)
+    assert response.status_code == 201
+
+
+@pytest.mark.query_budget(2)
+def test_list(measured, client, todos, auth_headers):
+    # Page with the total from the counters, tags of the page (the data version is cached by the first call)
+    client.get(f"{TODOS}/", headers=auth_headers)
+    response = measured("GET", f"{TODOS}/", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert all(item["tags"] for item in body["items"])
+    assert response.headers["ETag"]
+
+
+@pytest.mark.query_budget(0)
+def test_list_not_modified(measured, client, todos, auth_headers):
+    etag = client.get(f"{TODOS}/", headers=auth_headers).headers["ETag"]
+    response = measured("GET", f"{TODOS}/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.query_budget(4)
+def test_list_filtered(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/", params={"is_done": "true"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [todos[0]]
+
+
+@pytest.fixture(params=["fts", "like"])
+def search_path(request, monkeypatch):
+    """Run a test with searches on the full-text index, then with LIKE (the path of owners with few todos)"""
+    monkeypatch.setattr(settings, "fts_min_todos", 0 if request.param == "fts" else 10 ** 9)
+    return request.param
+
+
+@pytest.mark.query_budget(5)
+def test_list_search(measured, todos, auth_headers, search_path):
+    # Data version, counters, page, tags: the last page gives the total away, no second search to count
+    response = measured("GET", f"{TODOS}/", params={"q": "invoice"}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(item["id"] for item in body["items"]) == sorted(todos[:2])
+    assert body["total"] == 2
+
+
+@pytest.mark.parametrize("params", [{"q": "invoice"}, {"q": "invoice", "sort": "relevance"},
+                                    {"q": "invoice", "limit": 1}])
+def test_list_search_own_todos_only(client, todos, auth_headers, search_path, params):
+    # Another owner's matching todo is neither returned nor counted
+    other = client.post("/api/v1/auth/register", json={"email": "bob@example.com", "password": "password123"})
+    other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+    assert client.post(f"{TODOS}/", json={"title": "Send the invoice"}, headers=other_headers).status_code == 201
+
+    body = client.get(f"{TODOS}/", params=params, headers=auth_headers).json()
+    assert set(item["id"] for item in body["items"]) <= set(todos[:2])
+    assert body["total"] == 2
+
+
+@pytest.mark.query_budget(2)
+def test_list_cursor_page(measured, client, todos, auth_headers):
+    first = client.get(f"{TODOS}/", params={"limit": 2}, headers=auth_headers).json()
+    response = measured("GET", f"{TODOS}/", params={"limit": 2, "cursor": first["next_cursor"]},
+                        headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+@pytest.mark.parametrize("path, sort, values", [
+    (f"{TODOS}/", "-created_at", ["x", 1]),
+    (f"{TODOS}/", "-created_at", [[1], 1]),
+    (f"{TODOS}/", "-created_at", [None, 1]),
+    (f"{TODOS}/", "title", [5, 1]),
+    (f"{TODOS}/", "title", ["Pay", True]),
+    (f"{TODOS}/", "due_date", ["yes", None, 1]),
+    (f"{TODOS}/overdue", "due", [{"dt": "2026-01-01T00:00:00"}, "1"]),
+])
+def test_list_tampered_cursor(client, todos, auth_headers, path, sort, values):
+    # Well-formed cursors whose values do not fit the sort's columns: 400, not a failed bind
+    raw = json.dumps({"k": sort, "v": values}).encode()
+    cursor = base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+    params = {"cursor": cursor} if path.endswith("overdue") else {"cursor": cursor, "sort": sort}
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.query_budget(1)
+def test_list_sparse_fields(measured, client, todos, auth_headers):
+    # Page (with the total) only: no tags query when tags are not asked for
+    params = {"fields": "title,is_done,due_date", "limit": 2}
+    client.get(f"{TODOS}/", params=params, headers=auth_headers)
+    response = measured("GET", f"{TODOS}/", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [list(item) for item in body["items"]] == [["title", "is_done", "due_date", "id"]] * 2
+    # Cursors still work: the sort key is selected even though it is not returned
+    following = client.get(f"{TODOS}/", params={**params, "cursor": body["next_cursor"]}, headers=auth_headers)
+    assert [item["id"] for item in following.json()["items"]] == [todos[0]]
+
+
+def test_list_unknown_field(client, todos, auth_headers):
+    response = client.get(f"{TODOS}/", params={"fields": "id,owner"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "owner" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("sort, filters, expected", [
+    # Indexes into todos + [an undated open todo]; todos[0] is done and undated
+    ("due_date", {}, [1, 2, 0, 3]),
+    ("is_done,due_date,-created_at", {}, [1, 2, 3, 0]),
+    ("is_done,due_date,-created_at", {"is_done": "false"}, [1, 2, 3]),
+    ("title", {}, [2, 3, 1, 0]),
+    ("-title", {}, [0, 1, 3, 2]),
+    ("-updated_at", {}, [3, 0, 2, 1]),
+])
+def test_list_sorted_pages(client, todos, auth_headers, sort, filters, expected):
+    response = client.post(f"{TODOS}/", json={"title": "Call the bank"}, headers=auth_headers)
+    ids = todos + [response.json()["id"]]
+    # One todo per page: every cursor, including one inside the undated todos, resumes the order
+    seen, params = [], {"sort": sort, "limit": 1, **filters}
+    while True:
+        response = client.get(f"{TODOS}/", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen += [item["id"] for item in body["items"]]
+        if not body["next_cursor"]:
+            break
+        params["cursor"] = body["next_cursor"]
+    assert seen == [ids[i] for i in expected]
+
+
+def test_list_unsupported_sort(client, todos, auth_headers):
+    # No index returns this order: rejected rather than sorted in memory
+    response = client.get(f"{TODOS}/", params={"sort": "title,due_date"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "due_date" in response.json()["detail"]
+
+
+@pytest.mark.query_budget(5)
+def test_overdue(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/overdue", headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [todos[1]]
+
+
+@pytest.mark.query_budget(5)
+def test_today(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/today", headers=auth_headers)
+    assert response.status_code == 200
+    assert todos[2] in [item["id"] for item in response.json()["items"]]
+
+
+@pytest.mark.query_budget(1)
+def test_get(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/{todos[0]}", headers=auth_headers)
+    assert response.status_code == 200
+    assert sorted(tag["name"] for tag in response.json()["tags"]) == ["urgent", "work"]
+
+
+@pytest.mark.query_budget(1)
+def test_get_sparse_fields(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/{todos[0]}", params={"fields": "tags"}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body) == ["id", "tags"]
+    assert sorted(tag["name"] for tag in body["tags"]) == ["urgent", "work"]
+
+
+@pytest.mark.query_budget(1)
+def test_get_missing(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/999999", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.query_budget(4)
+def test_put(measured, todos, auth_headers):
+    body = {"title": "Write the invoice report", "tags": ["work"]}
+    response = measured("PUT", f"{TODOS}/{todos[0]}", json=body, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == body["title"]
+    assert [tag["name"] for tag in response.json()["tags"]] == ["work"]
+
+
+def test_write_and_read_tag_order(client, todos, auth_headers):
+    # Writes return tags in the order reads do (by name), whatever order they were sent in
+    tags = ["zeta", "alpha", "mid"]
+    written = [
+        client.patch(f"{TODOS}/{todos[0]}", json={"tags": tags}, headers=auth_headers).json(),
+        client.post(f"{TODOS}/batch", json={"create": [{"title": "Batched", "tags": tags}]},
+                    headers=auth_headers).json()["created"][0]["todo"],
+    ]
+    for todo in written:
+        read = client.get(f"{TODOS}/{todo['id']}", headers=auth_headers).json()
+        assert todo["tags"] == read["tags"]
+        assert [tag["name"] for tag in read["tags"]] == sorted(tags)
+
+
+@pytest.mark.query_budget(1)
+def test_put_missing(measured, todos, auth_headers):
+    # Not found comes from the UPDATE matching no row
+    response = measured("PUT", f"{TODOS}/999999", json={"title": "Nothing"}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.query_budget(3)
+def test_patch_reopen(measured, client, todos, auth_headers):
+    # The flip of is_done is detected by the UPDATE itself and moves the done counter
+    response = measured("PATCH", f"{TODOS}/{todos[0]}", json={"is_done": False}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["is_done"] is False
+    assert client.get(f"{TODOS}/", params={"is_done": "true"}, headers=auth_headers).json()["total"] == 0
+
+
+@pytest.mark.query_budget(3)
+def test_patch_without_tags(measured, todos, auth_headers):
+    response = measured("PATCH", f"{TODOS}/{todos[1]}", json={"description": "before Friday"},
+                        headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["description"] == "before Friday"
+
+
+@pytest.mark.query_budget(3)
+def test_complete(measured, todos, auth_headers):
+    response = measured("POST", f"{TODOS}/{todos[1]}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["is_done"] is True
+
+
+@pytest.mark.query_budget(3)
+def test_complete_already_done(measured, todos, auth_headers):
+    # Nothing to write: the row and its tags are read, no counter bump or commit
+    response = measured("POST", f"{TODOS}/{todos[0]}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    assert sorted(tag["name"] for tag in response.json()["tags"]) == ["urgent", "work"]
+
+
+@pytest.mark.query_budget(3)
+def test_delete(measured, client, todos, auth_headers):
+    response = measured("DELETE", f"{TODOS}/{todos[2]}", headers=auth_headers)
+    assert response.status_code == 204
+    assert client.get(f"{TODOS}/{todos[2]}", headers=auth_headers).status_code == 404
+
+
+@pytest.mark.query_budget(1)
+def test_delete_missing(measured, todos, auth_headers):
+    response = measured("DELETE", f"{TODOS}/999999", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.query_budget(13)
+def test_batch(measured, todos, auth_headers):
+    body = {
+        "create": [{"title": f"Batch item {i}", "tags": ["batch", f"tag-{i % 3}"]} for i in range(50)],
+        "update": [{"id": todos[1], "title": "Pay the invoice now"}],
+        "complete": [todos[2]],
+        "delete": [todos[0]],
+    }
+    response = measured("POST", f"{TODOS}/batch", json=body, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    created = result["created"]
+    assert [item["status"] for item in created] == ["created"] * 50
+    assert [item["todo"]["title"] for item in created] == [f"Batch item {i}" for i in range(50)]
+    assert all(item["id"] == item["todo"]["id"] for item in created)
+    assert len(set(item["id"] for item in created)) == 50
+    assert [[tag["name"] for tag in item["todo"]["tags"]] for item in created] == [
+        sorted(["batch", f"tag-{i % 3}"]) for i in range(50)]
+    [updated], [completed], [deleted] = result["updated"], result["completed"], result["deleted"]
+    assert (updated["id"], updated["status"], updated["todo"]["title"]) == (todos[1], "updated", "Pay the invoice now")
+    assert (completed["id"], completed["status"], completed["todo"]["is_done"]) == (todos[2], "completed", True)
+    assert (deleted["id"], deleted["status"]) == (todos[0], "deleted")
+
+
+@pytest.mark.query_budget(7)
+def test_import_ndjson(measured, auth_headers):
+    lines = [json.dumps({"title": f"Imported {i}", "tags": ["imported"]}) for i in range(20)]
+    lines.append("not json")
+    response = measured("POST", f"{TODOS}/import", params={"format": "ndjson"},
+                        content="\n".join(lines).encode(), headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (20, 1)
+    assert body["completed"] is True
+    assert body["progress"] == [{"chunk": 1, "first_line": 1, "last_line": 21, "imported": 20, "failed": 1,
+                                 "error": None}]
+
+
+def test_import_chunk_failure(client, auth_headers, monkeypatch):
+    # A database error in one chunk is reported on it; earlier chunks stay committed
+    monkeypatch.setattr(settings, "import_chunk_size", 5)
+    create_many = TodoRepository.create_many
+    calls = []
+
+    def failing_create_many(self, creates, owner_id):
+        calls.append(len(creates))
+        if len(calls) == 2:
+            self.db.execute(text("SELECT * FROM no_such_table"))
+        return create_many(self, creates, owner_id)
+
+    monkeypatch.setattr(TodoRepository, "create_many", failing_create_many)
+    lines = [json.dumps({"title": f"Imported {i}"}) for i in range(12)]
+    response = client.post(f"{TODOS}/import", params={"format": "ndjson"}, content="\n".join(lines).encode(),
+                           headers=auth_headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["imported"], body["failed"], body["chunks"], body["completed"]) == (5, 5, 1, False)
+    first, failed = body["progress"]
+    assert (first["first_line"], first["last_line"], first["imported"], first["error"]) == (1, 5, 5, None)
+    assert (failed["chunk"], failed["first_line"], failed["last_line"], failed["imported"]) == (2, 6, 10, 0)
+    assert failed["error"] == "Database error, chunk not saved: OperationalError"
+    # The third chunk was never read
+    assert calls == [5, 5]
+    assert client.get(f"{TODOS}/", headers=auth_headers).json()["total"] == 5
+
+
+@pytest.mark.query_budget(7)
+def test_import_csv(measured, auth_headers):
+    rows = ["title,description,tags"] + [f'Imported {i},"multi\nline",imported' for i in range(5)]
+    response = measured("POST", f"{TODOS}/import", params={"format": "csv"},
+                        content="\n".join(rows).encode(), headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 5
+
+
+@pytest.mark.query_budget(7)
+def test_import_csv_bad_rows(measured, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_record_size", 50)
+    rows = [
+        "title,description",
+        '12" monitor,literal quote',
+        "Too many,columns,here",
+        "Long line," + "x" * 60,
+        'Unterminated,"quote',
+        "Last row,fine",
+    ]
+    response = measured("POST", f"{TODOS}/import", params={"format": "csv"},
+                        content="\n".join(rows).encode(), headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (2, 3)
+    assert [error["line"] for error in body["errors"]] == [3, 4, 5]
+
+
+@pytest.mark.query_budget(2)
+def test_export(measured, todos, auth_headers):
+    response = measured("GET", f"{TODOS}/export", params={"format": "ndjson"}, headers=auth_headers)
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(record["id"] for record in records) == sorted(todos)
+
+
+@pytest.mark.query_budget(0)
+def test_requires_authentication(measured):
+    response = measured("GET", f"{TODOS}/")
+    assert response.status_code == 401